@@ -6,9 +6,10 @@ __author__ = "Kazuya O'moto <komoto@jeol.co.jp>"
 
 from contextlib import contextmanager
 from datetime import datetime
-from functools import wraps, partial
+from functools import wraps, partial, lru_cache
 import traceback
 import builtins
+import sys
 import textwrap
 import time
 import os
@@ -168,6 +169,15 @@ _speckeys = {
 
 _speckeys_wxkmap = dict((v, k) for k, v in _speckeys.items())
 
+## Precomputed table of key names {keycode: name}.
+_keynames = {k: chr(k).lower() for k in range(0x20, 0x100)} | _speckeys
+
+## Cache of the interned hotkey strings {(modifiers, keycode): hotkey}.
+_hotkeys = {}
+
+## Modifier prefixes in the order of the bits of the cache key.
+_modifiers = ('Lwin-', 'Rwin-', 'C-', 'M-', 'S-')
+
 
 def hotkey(evt):
     """Interpret evt.KeyCode as hotkey:str and overwrite evt.key.
@@ -175,25 +185,22 @@ def hotkey(evt):
     [LR]win + ctrl + alt(meta) + shift.
     """
     key = evt.GetKeyCode()
-    mod = ""
-    for k, v in ((wx.WXK_WINDOWS_LEFT, 'Lwin-'),
-                 (wx.WXK_WINDOWS_RIGHT, 'Rwin-'),
-                 # (wx.WXK_CONTROL, 'C-'),
-                 # (wx.WXK_ALT,     'M-'),
-                 # (wx.WXK_SHIFT,   'S-')
-                 ):
-        if key != k and wx.GetKeyState(k):  # Note: lazy-eval state
-            mod += v
-    
-    if key != wx.WXK_CONTROL and evt.controlDown: mod += "C-"
-    if key != wx.WXK_ALT     and evt.altDown:     mod += "M-"
-    if key != wx.WXK_SHIFT   and evt.shiftDown:   mod += "S-"
-    
-    key = _speckeys.get(key) or chr(key).lower()
-    evt.key = mod + key
+    mods = 0
+    if key != wx.WXK_WINDOWS_LEFT  and wx.GetKeyState(wx.WXK_WINDOWS_LEFT):  mods |= 1
+    if key != wx.WXK_WINDOWS_RIGHT and wx.GetKeyState(wx.WXK_WINDOWS_RIGHT): mods |= 2
+    if key != wx.WXK_CONTROL and evt.controlDown: mods |= 4
+    if key != wx.WXK_ALT     and evt.altDown:     mods |= 8
+    if key != wx.WXK_SHIFT   and evt.shiftDown:   mods |= 16
+    try:
+        evt.key = _hotkeys[mods, key]
+    except KeyError:
+        mod = ''.join(v for j, v in enumerate(_modifiers) if mods & (1 << j))
+        name = _keynames.get(key) or chr(key).lower()
+        evt.key = _hotkeys[mods, key] = sys.intern(mod + name)
     return evt.key
 
 
+@lru_cache(maxsize=None)
 def _regulate_key(key):
     return (key.replace("ctrl-",  "C-")  # modifier keys abbreviation
                .replace("alt-",   "M-")
@@ -1102,6 +1109,7 @@ class ShellFrame(MiniFrame):
         debugger:   wxpdb.Debugger object
         ginfo:      globals list
         linfo:      locals list
+        profiler:   wxfsm.ActionProfiler object
     
     Built-in utility::
     
@@ -1171,6 +1179,7 @@ class ShellFrame(MiniFrame):
         from .wxwit import Inspector
         from .wxmon import EventMonitor
         from .wxwil import LocalsWatcher
+        from .wxfsm import ActionProfiler
         from .controls import Icon, Indicator
         
         self.debugger = Debugger(self,
@@ -1187,6 +1196,7 @@ class ShellFrame(MiniFrame):
         self.monitor = EventMonitor(self, name="Monitor")
         self.ginfo = LocalsWatcher(self, name="globals")
         self.linfo = LocalsWatcher(self, name="locals")
+        self.profiler = ActionProfiler(self, name="Profiler")
         
         self.console = AuiNotebook(self, size=(600,400), name='console')
         self.console.AddPage(self.rootshell, "root", bitmap=Icon('core'))
@@ -1209,6 +1219,7 @@ class ShellFrame(MiniFrame):
         self.watcher.AddPage(self.linfo, "locals")
         self.watcher.AddPage(self.monitor, "Monitor", bitmap=Icon('tv'))
         self.watcher.AddPage(self.inspector, "Inspector", bitmap=Icon('inspect'))
+        self.watcher.AddPage(self.profiler, "Profiler")
         
         self.watcher.Bind(wx.EVT_SHOW, self.OnGhostShow)
         
@@ -1,7 +1,10 @@
 #! python3
 """Graph manager.
 """
+from concurrent.futures import ThreadPoolExecutor, wait
+from collections import deque
 from contextlib import contextmanager
+from itertools import islice
 from datetime import datetime
 from functools import wraps
 from importlib import import_module, reload
@@ -13,6 +16,7 @@ import inspect
 import sys
 import os
 import platform
+import re
 import json
 import wx
 from wx import aui
@@ -45,7 +49,9 @@ class Thread:
         result: A variable that retains the last retval of f.
         worker: Reference of the worker thread.
         owner: Reference of the handler owner (was typ. f.__self__).
-               If None, the thread_event is handled by its own handler.
+               If None, the thread_event is handled by its own handler,
+               which is made threadsafe so that the events from the worker
+               are queued and handled in the main thread.
         event: A common event flag to interrupt the process.
     
     There are two flags to check the thread status:
@@ -87,6 +93,9 @@ class Thread:
                    'thread_end' : [None],
                 },
             })
+            ## The events from the worker are queued and handled in the main thread.
+            self.handler.threadsafe = True
+            self.handler.scheduler = wx.CallAfter
 
     def __del__(self):
         if self.active:
@@ -191,13 +200,22 @@ class Thread:
             if sentinel:
                 self.handler.unbind(sentinel, _hook)
 
+    def _notify(self, event):
+        ## Handle the thread event in the main thread (internal use only).
+        ## The owner's handler is shared with the main thread and is not made
+        ## threadsafe, since the calls from the worker would then return None.
+        if self.handler.threadsafe:
+            self.handler(event, self)
+        else:
+            wx.CallAfter(self.handler, event, self)
+
     def Start(self, f, *args, **kwargs):
         """Start the thread to run the specified function.
         """
         @wraps(f)
         def _f(*v, **kw):
             try:
-                wx.CallAfter(self.handler, 'thread_begin', self)
+                self._notify('thread_begin')
                 self.result = f(*v, **kw)
             except BdbQuit:
                 pass
@@ -213,7 +231,7 @@ class Thread:
                              style=wx.ICON_ERROR)
             finally:
                 self.active = 0
-                wx.CallAfter(self.handler, 'thread_end', self)
+                self._notify('thread_end')
         
         if self.running:
             wx.MessageBox("The thread is running (Press [C-g] to quit).",
@@ -562,6 +580,8 @@ class Graph(GraphPlot):
             return self.parent.handler(self.handler.current_event, *v, **kw)
         
         def _draw():
+            if self.frame:
+                self.frame.update_viewport()  # Substitutes internal_callback.
             self.draw(internal_callback=False)
         
         self.handler.append({  # DNA<Graph>
@@ -582,6 +602,16 @@ class Graph(GraphPlot):
         
         self.extra_artists = {}
 
+    def read_buffer(self, path):
+        """Read buffer from the path using the loader (override)."""
+        m = re.match(r"(.*)<(\d+)>$", path)  # *dummy-path* in multi-page tiff
+        if m:
+            buf, _info = self.loader.read_buffer(m[1])
+            buf.seek(int(m[2]))
+        else:
+            buf, _info = self.loader.read_buffer(path)
+        return buf
+
     @property
     def overlay_artists(self):
         extra = [art for artists in self.extra_artists.values()
@@ -621,9 +651,10 @@ class Graph(GraphPlot):
         if (a and b
               and a.unit == b.unit
               and a.buffer.shape == b.buffer.shape):
-            self.frame.update_interpolation_mode()  # Substitutes internal_callback.
             self.xlim = other.xlim
             self.ylim = other.ylim
+            self.frame.update_viewport()  # Substitutes internal_callback.
+            self.frame.update_interpolation_mode()
             self.draw(internal_callback=False)  # To avoid recursive calls.
 
     def on_resize_start(self):
@@ -633,6 +664,7 @@ class Graph(GraphPlot):
     def on_resize_end(self):
         if self.frame:
             self.frame.set_visible(1)
+            self.frame.update_viewport()  # Substitutes internal_callback.
         self.draw(internal_callback=False)
 
     ## --------------------------------
@@ -1545,6 +1577,7 @@ class Frame(mwx.Frame):
     ## --------------------------------
     wildcards = [
         "TIF file (*.tif)|*.tif",
+        "NPY file (*.npy)|*.npy",
          "ALL files (*.*)|*.*",
     ]
 
@@ -1732,10 +1765,15 @@ class Frame(mwx.Frame):
     ## --------------------------------
     ## load/save images.
     ## --------------------------------
+    
+    ## Number of worker threads to read and convert buffers.
+    load_workers = min(8, os.cpu_count() or 1)
 
     @staticmethod
     def read_buffer(path):
         """Read buffer from a file (to be overridden)."""
+        if path.endswith('.npy'):
+            return np.load(path, mmap_mode='c'), {}  # cf. GraphPlot.lazy_loading
         buf = Image.open(path)
         info = {}
         # if buf.mode[:3] == 'RGB':   # カラー画像には対応しない．
@@ -1760,16 +1798,41 @@ class Frame(mwx.Frame):
     @ignore(ResourceWarning)
     def load_buffer(self, paths, view):
         """Load buffers from paths to the view window (internal use only).
+        
+        The buffers are read and converted in worker threads, and loaded
+        to the view in the order of the paths in the main thread.
         """
         frames = []
         frame = None
         paths = list(dict.fromkeys(paths))  # 順序を保って重複を除く．
+        n = len(paths)
+        dlg = None
+        if n > 1:
+            dlg = wx.ProgressDialog("Loading", f"Loading {n} files...",
+                    maximum=n, parent=self,
+                    style=wx.PD_APP_MODAL|wx.PD_CAN_ABORT|wx.PD_AUTO_HIDE
+                         |wx.PD_ELAPSED_TIME|wx.PD_REMAINING_TIME)
+        executor = ThreadPoolExecutor(self.load_workers)
+        tasks = deque()
+        pending = iter(paths)
         try:
-            for i, path in enumerate(paths):
+            for i in range(n):
+                ## Keep the workers reading ahead within the limit.
+                for path in islice(pending, 2 * self.load_workers - len(tasks)):
+                    tasks.append((path, executor.submit(self._read_pages, path, view)))
+                path, fut = tasks.popleft()
                 name = os.path.basename(path)
-                self.message("Loading {!r} ({} of {})...".format(name, i+1, len(paths)))
+                msg = "Loading {!r} ({} of {})...".format(name, i+1, n)
+                self.message(msg)
+                if dlg:
+                    while dlg.Update(i, msg)[0]:
+                        if wait([fut], timeout=0.1).done:
+                            break
+                    else:
+                        self.message("\b canceled.")
+                        break
                 try:
-                    buf, info = self.read_buffer(path)
+                    pages = fut.result()
                 except Image.UnidentifiedImageError:
                     retvals = self.handler('unknown_format', path)
                     if retvals and any(retvals):
@@ -1779,33 +1842,50 @@ class Frame(mwx.Frame):
                     print(e)
                     continue
                 
-                if isinstance(buf, TiffImageFile) and buf.n_frames > 1:
-                    ## multi-page tiff: 同名のインデクスファイルから属性を読み出す．
-                    res, mis = self.read_attributes(path[:-4] + ".index", check_path=False)
-                    items = list({**res, **mis}.items())
-                    n = buf.n_frames
-                    d = len(str(n))
-                    for j in range(n):
-                        self.message("Loading {!r} [{} of {} pages]...".format(name, j+1, n))
-                        buf.seek(j)
-                        if items:
-                            page_name, info = items[j]  # original buffer name and attributes
-                        else:
-                            page_name = name + f"<{j:0{d}}>"  # default buffer name
-                        info['pathname'] = path + f"<{j:0{d}}>"  # *dummy-path* in multi-page tiff
-                        frame = view.load(buf, page_name, show=0, **info)
-                        frames.append(frame)
-                else:
-                    frame = view.load(buf, name, show=0, pathname=path, **info)
+                for buf, preview, page_name, info in pages:
+                    frame = view.load(buf, page_name, show=0, preview=preview, **info)
                     frames.append(frame)
-            self.message("\b done.")
+            else:
+                self.message("\b done.")
         except Exception as e:
             self.message("\b failed.")
             self.post_msgbox(str(e), style=wx.ICON_ERROR)
+        finally:
+            for path, fut in tasks:
+                fut.cancel()
+            executor.shutdown(wait=False)
+            if dlg:
+                dlg.Destroy()
         
         view.select(frame)
         return frames
 
+    def _read_pages(self, path, view):
+        """Read and convert buffers from the path (called in worker threads).
+        
+        Returns:
+            list of (buffer, preview, name, info) for each page.
+        """
+        name = os.path.basename(path)
+        buf, info = self.read_buffer(path)
+        if isinstance(buf, TiffImageFile) and buf.n_frames > 1:
+            ## multi-page tiff: 同名のインデクスファイルから属性を読み出す．
+            res, mis = self.read_attributes(path[:-4] + ".index", check_path=False)
+            items = list({**res, **mis}.items())
+            n = buf.n_frames
+            d = len(str(n))
+            pages = []
+            for j in range(n):
+                buf.seek(j)
+                if items:
+                    page_name, info = items[j]  # original buffer name and attributes
+                else:
+                    page_name = name + f"<{j:0{d}}>"  # default buffer name
+                info = dict(info, pathname=path + f"<{j:0{d}}>")  # *dummy-path* in multi-page tiff
+                pages.append((*view.convert_buffer(buf), page_name, info))
+            return pages
+        return [(*view.convert_buffer(buf), name, dict(info, pathname=path))]
+
     def save_buffer(self, path, frame):
         """Save buffer of the frame to a file (internal use only)."""
         try:
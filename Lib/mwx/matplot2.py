@@ -1,6 +1,8 @@
 #! python3
 """mwxlib base plot.
 """
+import threading
+import time
 import wx
 
 import matplotlib; matplotlib.use('wxagg')  # noqa
@@ -69,7 +71,7 @@ if 1:
                 return
             ## Redraw.
             if self.useblit:
-                self.canvas.Parent.draw_overlay()
+                self.canvas.Parent.draw_cursor()
             else:
                 self.canvas.draw_idle()
 
@@ -139,6 +141,13 @@ class MatplotPanel(wx.Panel):
         self.modeline.Show(0)
         self.Layout()
         
+        def _H(event):
+            ## Handle the event after the pending motion and wheel events.
+            def _handle(evt):
+                self.handler.flush()
+                return self.handler(event, evt)
+            return _handle
+        
         ## mpl event handler
         self.canvas.mpl_connect('pick_event', self.on_pick)
         self.canvas.mpl_connect('scroll_event', self.on_scroll)
@@ -148,28 +157,28 @@ class MatplotPanel(wx.Panel):
         self.canvas.mpl_connect('button_release_event', self.on_button_release)
         self.canvas.mpl_connect('motion_notify_event', self.on_motion_notify)
         
-        self.canvas.mpl_connect('figure_enter_event', lambda v: self.handler('figure_enter', v))
-        self.canvas.mpl_connect('figure_leave_event', lambda v: self.handler('figure_leave', v))
-        self.canvas.mpl_connect('axes_enter_event', lambda v: self.handler('axes_enter', v))
-        self.canvas.mpl_connect('axes_leave_event', lambda v: self.handler('axes_leave', v))
-        self.canvas.mpl_connect('resize_event', lambda v: self.handler('canvas_resize', v))
+        self.canvas.mpl_connect('figure_enter_event', _H('figure_enter'))
+        self.canvas.mpl_connect('figure_leave_event', _H('figure_leave'))
+        self.canvas.mpl_connect('axes_enter_event', _H('axes_enter'))
+        self.canvas.mpl_connect('axes_leave_event', _H('axes_leave'))
+        self.canvas.mpl_connect('resize_event', _H('canvas_resize'))
         self.canvas.mpl_connect('draw_event', lambda v: self.handler('canvas_drawn', v))
         
         self.canvas.Bind(wx.EVT_CHAR_HOOK, self.on_hotkey_press)
         self.canvas.Bind(wx.EVT_KEY_DOWN, self.on_hotkey_down)
         self.canvas.Bind(wx.EVT_KEY_UP, self.on_hotkey_up)
         
-        self.canvas.Bind(wx.EVT_MOUSE_AUX1_DOWN, lambda v: self.handler('Xbutton1 pressed', v))
-        self.canvas.Bind(wx.EVT_MOUSE_AUX2_DOWN, lambda v: self.handler('Xbutton2 pressed', v))
-        self.canvas.Bind(wx.EVT_MOUSE_AUX1_UP, lambda v: self.handler('Xbutton1 released', v))
-        self.canvas.Bind(wx.EVT_MOUSE_AUX2_UP, lambda v: self.handler('Xbutton2 released', v))
+        self.canvas.Bind(wx.EVT_MOUSE_AUX1_DOWN, _H('Xbutton1 pressed'))
+        self.canvas.Bind(wx.EVT_MOUSE_AUX2_DOWN, _H('Xbutton2 pressed'))
+        self.canvas.Bind(wx.EVT_MOUSE_AUX1_UP, _H('Xbutton1 released'))
+        self.canvas.Bind(wx.EVT_MOUSE_AUX2_UP, _H('Xbutton2 released'))
         
-        self.canvas.Bind(wx.EVT_SET_FOCUS, lambda v: self.handler('focus_set', v))
-        self.canvas.Bind(wx.EVT_KILL_FOCUS, lambda v: self.handler('focus_kill', v))
+        self.canvas.Bind(wx.EVT_SET_FOCUS, _H('focus_set'))
+        self.canvas.Bind(wx.EVT_KILL_FOCUS, _H('focus_kill'))
         
         ## `Rbutton pressed` on_menu is enabled for Normal mode only.
         ## The context menus is disabled and never skip to the next handler.
-        self.canvas.Bind(wx.EVT_CONTEXT_MENU, lambda v: self.handler('context_menu', v))
+        self.canvas.Bind(wx.EVT_CONTEXT_MENU, _H('context_menu'))
         
         def fork(evt):
             return self.handler.call(self.handler.current_event, evt)
@@ -310,6 +319,12 @@ class MatplotPanel(wx.Panel):
             default=NORMAL
         )
         
+        ## Coalesce the motion and wheel events until the next idle (cf. handler.post).
+        def _schedule(flush):
+            wx.CallAfter(lambda: self and flush())  # unless the panel is deleted
+        
+        self.__handler.scheduler = _schedule
+        
         self.menu = [
             (mwx.ID_(201), "&Copy image", "Copy canvas image to clipboard",
                 lambda v: self.copy_to_clipboard()),
@@ -336,42 +351,141 @@ class MatplotPanel(wx.Panel):
         # <matplotlib.widgets.Cursor>
         self.cursor = Cursor(self.axes, useblit=True, color='grey', linewidth=1)
         
-        self.background = None
+        self.background = None  # static layer
+        self._overlay_background = None  # static + overlay layer
+        
+        self.draw_requested = 0  # Number of the draw requests.
+        self.draw_executed = 0   # Number of the draws actually done.
+        self.__draw_request = self._new_draw_request()
+        self.__draw_scheduled = False
+        self.__draw_lock = threading.Lock()  # The request can be merged from threads.
+        self.__draw_time = 0
 
     @property
     def overlay_artists(self):
         return [self.selected]
 
-    ## Note: To avoid a wxAssertionError when running in a thread.
-    @postcall
+    ## The maximum frame rate of drawing [Hz].
+    ## The draw requests are merged and done at most once per frame.
+    max_fps = 60
+
+    ## Note: To avoid a wxAssertionError when running in a thread,
+    ##       the draw requests are processed in the main thread.
     def draw(self, *artists, internal_callback=True):
         """Draw plots.
         Call each time the drawing should be updated.
+        
+        The canvas is drawn in three layers: static, overlay, and cursor.
+        If no artists are given, the static layer (all but the overlay and
+        cursor artists) is redrawn and cached as the background.
+        Otherwise, the artists are drawn on the cached background and blitted.
+        
+        The requests are merged and processed later by the draw scheduler.
         """
-        if not artists:
-            artists = self.overlay_artists
-            states = [art.get_visible() for art in artists]
-            try:
-                for art in artists:  # オーバーレイを消して描画処理．
-                    art.set_visible(0)
-                if internal_callback:
-                    self.handler('canvas_draw', self.frame)
-                self.canvas.draw()
-            finally:
-                for art, v in zip(artists, states):  # オーバーレイを戻して再描画処理↓
-                    art.set_visible(v)
+        if artists:
+            self._request_draw(artists=artists)
+        else:
+            self._request_draw(full=True, callback=internal_callback)
+
+    def draw_overlay(self, cursor=True):
+        """Draw the overlay layer on the static layer and cache it."""
+        self._request_draw(overlay=True, cursor=cursor)
+
+    def draw_cursor(self):
+        """Draw the cursor layer on the cached overlay layer."""
+        self._request_draw(cursor=True)
+
+    def _request_draw(self, full=False, callback=False, artists=(), overlay=False, cursor=False):
+        ## """Merge the draw request into the pending one (internal use only)."""
+        with self.__draw_lock:
+            self.draw_requested += 1
+            req = self.__draw_request
+            req['full'] |= full
+            req['callback'] |= full and callback
+            req['overlay'] |= overlay
+            req['cursor'] |= cursor
+            for art in artists:
+                req['artists'][id(art)] = art
+            if self.__draw_scheduled:
+                return
+            self.__draw_scheduled = True
+        wx.CallAfter(lambda: self and self._flush_draw())
+
+    def _flush_draw(self):
+        ## """Process the pending draw request (internal use only)."""
+        wait = self.__draw_time + 1/self.max_fps - time.perf_counter()
+        if wait > 1e-3:
+            wx.CallLater(int(wait * 1000) + 1, lambda: self and self._flush_draw())
+            return
+        with self.__draw_lock:
+            self.__draw_scheduled = False
+            req = self.__draw_request
+            self.__draw_request = self._new_draw_request()
+        self.__draw_time = time.perf_counter()
+        self.draw_executed += 1
+        
+        artists = list(req['artists'].values())
+        if req['full']:
+            self._draw_static(req['callback'])
+            self._draw_overlay(cursor=False)
+        elif req['overlay']:
+            self._draw_overlay(req['cursor'])
+        elif artists:
+            self._overlay_background = None
+            if self.background is not None:
+                self.canvas.restore_region(self.background)
+        elif req['cursor']:
+            self._draw_cursor()
         
+        if artists:
+            ## The overlay artists have been drawn in the overlay layer.
+            overlays = self.overlay_artists if req['full'] or req['overlay'] else []
+            for art in artists:
+                ## 描画時点で削除されている可能性があるため axes の有無をチェックする．
+                if art.axes and art not in overlays:
+                    self.axes.draw_artist(art)
+            self.canvas.blit(self.axes.bbox)
+
+    @staticmethod
+    def _new_draw_request():
+        return dict(full=False, callback=False, overlay=False, cursor=False, artists={})
+
+    def _draw_static(self, callback):
+        self._overlay_background = None
+        artists = self.overlay_artists
+        states = [art.get_visible() for art in artists]
+        try:
+            for art in artists:  # オーバーレイを消して描画処理．
+                art.set_visible(0)
+            if callback:
+                self.handler('canvas_draw', self.frame)
+            self.canvas.draw()
+        finally:
+            for art, v in zip(artists, states):  # オーバーレイを戻して再描画処理↓
+                art.set_visible(v)
+
+    def _draw_overlay(self, cursor):
         if self.background is not None:
             self.canvas.restore_region(self.background)
-        for art in artists:
-            ## postcall 時点で削除されている可能性があるため axes の有無をチェックする．
+        for art in self.overlay_artists:
+            ## 描画時点で削除されている可能性があるため axes の有無をチェックする．
             if art.axes:
                 self.axes.draw_artist(art)
+        if self.background is not None:
+            self._overlay_background = self.canvas.copy_from_bbox(self.axes.bbox)
+        if cursor:
+            self.axes.draw_artist(self.cursor.linev)
+            self.axes.draw_artist(self.cursor.lineh)
         self.canvas.blit(self.axes.bbox)
 
-    def draw_overlay(self, cursor=True):
-        cursor_lines = [self.cursor.linev, self.cursor.lineh] if cursor else []
-        self.draw(*self.overlay_artists, *cursor_lines)
+    def _draw_cursor(self):
+        if self._overlay_background is None:
+            self._draw_overlay(cursor=True)
+            return
+        self.canvas.restore_region(self._overlay_background)
+        self.axes.draw_artist(self.cursor.linev)
+        self.axes.draw_artist(self.cursor.lineh)
+        self.canvas.blit(self.axes.bbox)
 
     @postcall
     def copy_to_clipboard(self, background_only=False):
@@ -565,11 +679,13 @@ class MatplotPanel(wx.Panel):
             evt.xdata = x = xs[k]
             evt.ydata = y = ys[k]
             self.selector = ([x], [y])
+            self.handler.flush()
             self.handler('art_picked', evt)
             self.message("({:g}, {:g}) index {}".format(x, y, evt.index))
 
     def on_hotkey_press(self, evt):  # <wx._core.KeyEvent>
         """Called when a key is pressed."""
+        self.handler.flush()
         key = hotkey(evt)
         self.__key = _regulate_key(key + '-')
         if self.handler(f'{key} pressed', evt) is None:
@@ -586,6 +702,7 @@ class MatplotPanel(wx.Panel):
 
     def on_hotkey_up(self, evt):  # <wx._core.KeyEvent>
         """Called when a key is released."""
+        self.handler.flush()
         key = hotkey(evt)
         self.__key = ''
         if self.handler(f'{key} released', evt) is None:
@@ -608,6 +725,7 @@ class MatplotPanel(wx.Panel):
 
     def on_button_press(self, evt):  # <matplotlib.backend_bases.MouseEvent>
         """Called when the mouse button is pressed."""
+        self.handler.flush()
         self.p_event = evt
         key = self._on_mouse_event(evt)
         if evt.dblclick:
@@ -619,6 +737,7 @@ class MatplotPanel(wx.Panel):
 
     def on_button_release(self, evt):  # <matplotlib.backend_bases.MouseEvent>
         """Called when the mouse button is released."""
+        self.handler.flush()
         key = self._on_mouse_event(evt)
         if self._isDragging:
             self._isDragging = False
@@ -631,16 +750,19 @@ class MatplotPanel(wx.Panel):
         self.p_event = None
 
     def on_motion_notify(self, evt):  # <matplotlib.backend_bases.MouseEvent>
-        """Called when the mouse is moved."""
+        """Called when the mouse is moved.
+        The motion events are coalesced to the latest (cf. handler.post).
+        """
         key = self._on_mouse_event(evt)
         if evt.button in (1,2,3):
             if not self._isDragging:
+                self.handler.flush()
                 self._isDragging = True
                 self.handler(f'{key}drag begin', evt)
             else:
-                self.handler(f'{key}drag move', evt)
+                self.handler.post(f'{key}drag move', evt)
         elif evt.inaxes is self.axes:
-            self.handler('axes motion', evt)
+            self.handler.post('axes motion', evt)
         else:
             lx, ly = self.xlim, self.ylim
             if   evt.xdata < lx[0]: axis = 'yaxis'
@@ -649,14 +771,14 @@ class MatplotPanel(wx.Panel):
             elif evt.ydata > ly[1]: axis = 'x2axis'
             else:
                 return
-            self.handler(f'{axis} motion', evt)
+            self.handler.post(f'{axis} motion', evt)
 
     def on_scroll(self, evt):  # <matplotlib.backend_bases.MouseEvent>
-        """Called when scrolling the mouse wheel."""
-        self.p_event = evt
+        """Called when scrolling the mouse wheel.
+        The wheel events are coalesced to the latest (cf. handler.post).
+        """
         key = self._on_mouse_event(evt)
-        self.handler(f'{key} pressed', evt)
-        self.p_event = None
+        self.handler.post(f'{key} pressed', evt)
 
     ## --------------------------------
     ## Draw and Pan/Zoom actions.
@@ -672,6 +794,7 @@ class MatplotPanel(wx.Panel):
     def OnDrawn(self, evt):
         """Called after the canvas is drawn."""
         self.background = self.canvas.copy_from_bbox(self.axes.bbox)
+        self._overlay_background = None
 
     def OnMotion(self, evt):
         """Called when mouse moves in axes."""
@@ -1,6 +1,9 @@
 #! python3
 """mwxlib graph plot for images.
 """
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import TemporaryDirectory, mkstemp
 import os
 import re
 import wx
@@ -36,7 +39,58 @@ def _to_cvtype(src):
     return src
 
 
-def _to_buffer(img):
+## TIFF raw modes that can be mapped onto arrays as they are.
+_tiff_rawmodes = {
+    'L'     : 'u1',
+    'I;16'  : '<u2',
+    'I;16S' : '<i2',
+    'I;32S' : '<i4',
+    'F;32F' : '<f4',
+}
+
+
+def _to_memmap(img):
+    """Map an uncompressed image file onto the memory.
+    
+    Returns:
+        np.memmap: Copy-on-write array backed by the file.
+        None: The image cannot be mapped (e.g., compressed, tiled, or RGB).
+    """
+    if isinstance(img, np.memmap):
+        return img
+    
+    if not isinstance(img, Image.Image) or not img.tile:
+        return None  # not an image file or already decoded
+    
+    w, h = img.size
+    start = img.tile[0][2]
+    rawmode = img.tile[0][3][0]
+    if rawmode not in _tiff_rawmodes:
+        return None
+    dtype = np.dtype(_tiff_rawmodes[rawmode])
+    
+    ## Check whether the strips are contiguous from top to bottom.
+    pos = start
+    y = 0
+    for codec, (l, t, r, b), offset, args in img.tile:
+        if (codec != 'raw' or offset != pos or (l, t, r) != (0, y, w)
+                or args[0] != rawmode or (len(args) > 2 and args[2] != 1)):
+            return None
+        pos += (b - t) * w * dtype.itemsize
+        y = b
+    if y != h:
+        return None
+    return np.memmap(img.filename, dtype=dtype, mode='c', offset=start, shape=(h, w))
+
+
+def _to_buffer(img, lazy=False):
+    if lazy:
+        buf = _to_memmap(img)
+        if buf is not None:
+            return buf
+    elif isinstance(img, np.memmap):
+        return np.array(img)  # read into memory
+    
     if isinstance(img, Image.Image):
         # return np.asarray(img)  # ref
         return np.array(img)  # copy
@@ -59,7 +113,95 @@ def _to_buffer(img):
     return img
 
 
-def _to_image(src, cutoff=0, threshold=None, binning=1):
+def _percentiles(src, q, method='exact', bins=4096, chunksize=2**22):
+    """Compute the lower/upper percentiles (q, 100-q) [%] of src at once.
+    
+    Args:
+        method: 'exact' uses np.percentile (partition of the whole array).
+                'histogram' counts the array by chunks in two passes.
+                The error is (max - min) / bins at most, or no error for integer arrays.
+        bins: number of the histogram bins for float arrays.
+        chunksize: number of elements to count at once.
+    """
+    if not src.size:
+        return 0, 0  # No values to count.
+    if method != 'histogram':
+        a, b = np.percentile(src, (q, 100-q))
+        return a, b
+    
+    def _chunks():
+        n = max(1, chunksize // (src.size // len(src) or 1))  # rows per chunk
+        for k in range(0, len(src), n):
+            yield src[k:k+n].ravel()
+    
+    lo = min(x.min() for x in _chunks())
+    hi = max(x.max() for x in _chunks())
+    if not (np.isfinite(lo) and np.isfinite(hi)):
+        a, b = np.percentile(src, (q, 100-q))
+        return a, b
+    
+    integer = src.dtype.kind in 'iu'
+    if integer:
+        lo, hi = int(lo), int(hi)  # Signed spans can exceed the dtype.
+    exact = integer and hi - lo < 2**20
+    if exact:
+        bins = hi - lo + 1
+        scale = 1
+    else:
+        scale = bins / (hi - lo) if hi > lo else 0
+    counts = np.zeros(bins, dtype=np.int64)
+    for x in _chunks():
+        if exact:
+            i = x.astype(np.intp) - lo
+        else:
+            if integer:
+                x = x.astype(np.float64)
+            i = ((x - lo) * scale).astype(np.intp)
+            np.minimum(i, bins-1, out=i)
+        counts += np.bincount(i, minlength=bins)
+    cdf = np.cumsum(counts)
+    
+    def _value(r):  # r-th smallest value
+        i = np.searchsorted(cdf, r, side='right')
+        if exact:
+            return lo + i
+        c = cdf[i-1] if i else 0
+        return lo + (i + (r - c + 0.5) / counts[i]) / scale if scale else lo
+    
+    def _rank(p):  # p-th percentile with linear interpolation
+        k = p/100 * (cdf[-1] - 1)
+        j = int(k)
+        a = _value(j)
+        return a + (k - j) * (_value(j+1) - a) if k > j else a
+    
+    return _rank(q), _rank(100-q)
+
+
+def _to_uint8(src, a, b, out=None):
+    """Convert buffer to <uint8> mapping [a, b] to [0, 255] with saturation.
+    
+    The rows are clipped and scaled block by block in a small working buffer,
+    so that no temporary arrays of the full size are allocated.
+    If `out` of the same shape is given, the result is written into it.
+    """
+    if out is None or out.shape != src.shape or not out.flags.c_contiguous:
+        out = np.empty(src.shape, np.uint8)
+    if not a < b:
+        np.greater(src, b, out=out)
+        out *= 255
+        return out
+    r = 255 / (b - a)
+    ## Clip in float32 (cv2 takes the absolute value of negatives).
+    rows = max(1, 2**20 // (src[:1].size or 1))
+    buf = np.empty((min(rows, len(src)),) + src.shape[1:], np.float32)
+    for i in range(0, len(src), rows):
+        tmp = buf[:len(src[i:i+rows])]
+        np.clip(src[i:i+rows], a, b, out=tmp, casting='unsafe')
+        cv2.convertScaleAbs(tmp, out[i:i+rows], alpha=r, beta=-r*a)
+    return out
+
+
+def _to_image(src, cutoff=0, threshold=None, binning=1, method='exact', out=None):
     """Convert buffer to image <uint8> with cutoff hi/lo %.
     
         >>> dst = (src-a) * 255 / (b-a)
@@ -73,17 +215,27 @@ def _to_image(src, cutoff=0, threshold=None, binning=1):
         cutoff: cutoff score [%] to cut the lo/hi limits
         threshold: limit bytes of image (to make matplotlib light)
         binning: minimum binning number of src array
+        method: percentile estimator for the cutoff (cf. _percentiles)
+        out: output image <uint8> to be reused if the shape matches
     """
-    if src.dtype in (np.complex64, np.complex128):  # maybe fft pattern
-        src = np.log(1 + abs(src))
-    
     if threshold:
         ## Reduce the binning by itemsize before finally converting to <uint8>.
         ## Select the larger value between binning and threshold.
         n = max(binning, int(np.sqrt(src.nbytes / threshold / src.itemsize)) + 1)
     else:
         n = binning
-    if n > 1:
+    
+    if isinstance(src, np.memmap):
+        ## Read every n-th pixel to bound the size of the file paged in.
+        src = np.array(src[::n, ::n])
+        m = 1
+    else:
+        m = n
+    
+    if src.dtype in (np.complex64, np.complex128):  # maybe fft pattern
+        src = np.log(1 + abs(src))
+    
+    if m > 1:
         src = _to_cvtype(src)
         src = cv2.resize(src, None, fx=1/n, fy=1/n, interpolation=cv2.INTER_AREA)
     
@@ -93,18 +245,37 @@ def _to_image(src, cutoff=0, threshold=None, binning=1):
     if hasattr(cutoff, '__iter__'):  # cutoff vlim: (vmin, vmax) is specified.
         a, b = cutoff
     elif cutoff > 0:
-        a = np.percentile(src, cutoff)
-        b = np.percentile(src, 100-cutoff)
+        a, b = _percentiles(src, cutoff, method)
     else:
         a = src.min()
         b = src.max()
     
-    r = (255 / (b - a)) if a < b else 1
-    ## img = cv2.convertScaleAbs(src, alpha=r, beta=-r*a)  # 負数は絶対値になるので以下に変更．
-    img = np.uint8((src - a) * r)
-    img[src < a] = 0
-    img[src > b] = 255
-    return n, (a, b), img
+    return n, (a, b), _to_uint8(src, a, b, out)
+
+
+def _to_level(src, n):
+    """Reduce the buffer by n-binning to make a level of the image pyramid.
+    
+    The trailing pixels that do not fill the n-bin are cut off so that
+    each pixel of the level corresponds to just n x n pixels of src.
+    """
+    h, w = src.shape[:2]
+    src = src[:h//n*n, :w//n*n]
+    if isinstance(src, np.memmap):
+        return np.array(src[::n, ::n])
+    if src.dtype in (np.complex64, np.complex128):  # maybe fft pattern
+        src = np.log(1 + abs(src))
+    src = _to_cvtype(src)
+    return cv2.resize(src, None, fx=1/n, fy=1/n, interpolation=cv2.INTER_AREA)
+
+
+def _within(v, window):
+    """Check if the window (n, i0, i1, j0, j1) contains v of the same level."""
+    if not window:
+        return False
+    n, i0, i1, j0, j1 = v
+    m, a0, a1, b0, b1 = window
+    return m == n and a0 <= i0 and i1 <= a1 and b0 <= j0 and j1 <= b1
 
 
 def _get_timestamp(filename):
@@ -129,12 +300,39 @@ def _get_timestamp(filename):
         return None
 
 
-def _get_uniqname(name, namelist):
+def _read_buffer(path):
+    """Read buffer from the path (including *dummy-path* in multi-page tiff)."""
+    m = re.match(r"(.*)<(\d+)>$", path)
+    if m:
+        buf = Image.open(m[1])
+        buf.seek(int(m[2]))
+        return buf
+    if path.endswith('.npy'):
+        return np.load(path, mmap_mode='c')
+    return Image.open(path)
+
+
+def _get_readable_timestamp(path):
+    """Timestamp of the file if it can be read back by `_read_buffer`."""
+    if path:
+        path = re.sub(r"<\d+>$", '', path)
+        ext = os.path.splitext(path)[1].lower()
+        if ext == '.npy' or ext in Image.registered_extensions():
+            return _get_timestamp(path) or None
+    return None
+
+
+def _get_uniqname(name, namelist, counter=None):
+    """Get a unique name not in the namelist.
+    If the counter {basename: i} is given, the suffix <i> starts from the last one.
+    """
     basename = name
-    i = 1
+    i = counter.get(basename, 1) if counter is not None else 1
     while name in namelist:
         i += 1
         name = f"{basename}<{i}>"
+    if counter is not None:
+        counter[basename] = i
     return name
 
 
@@ -152,16 +350,25 @@ class AxesImagePhantom:
         buf:  buffer
         name: buffer name
         show: show immediately when loaded
+        preview: (bins, cuts, image) converted in advance (cf. `convert_buffer`)
         **kwargs: frame attributes
     
     Note:
         Due to the problem of performance, the image pixel size could be reduced by binning.
+        When the parent exceeds `max_resident_bytes`, the buffer of a frame not shown
+        recently is evicted; it is read again from the file or mapped from a spill file.
+        When zoomed in beyond the resolution of the preview, the image is replaced with
+        the visible part of a finer level of the image pyramid (built lazily).
+        In viewport mode, only the visible part of the preview is drawn as well.
+        If the parent is in lazy loading mode, the buffer of an uncompressed file is
+        memory-mapped and paged in only when the pixels are accessed.
     """
-    def __init__(self, parent, buf, name, show=True, **kwargs):
+    def __init__(self, parent, buf, name, show=True, preview=None, **kwargs):
         self.parent = parent
         
         ## Properties of the frame/image.
         self._name = name
+        self._keys = ()  # Keys in the lookup index of the parent.
         self._attributes = kwargs
         self._pathname = kwargs.get('pathname')
         self._annotation = kwargs.get('annotation', '')
@@ -171,11 +378,13 @@ class AxesImagePhantom:
         self._mtime = _get_timestamp(self._pathname)
         
         ## Conditions for image loading.
-        self.buffer = _to_buffer(buf)
-        bins, vlim, img = _to_image(self.buffer,
-                                    cutoff=self.parent.cutoff_threshold,
-                                    threshold=self.parent.nbytes_threshold,
-                                    )
+        self.buffer = _to_buffer(buf, lazy=self.parent.lazy_loading)
+        self._backed = None   # Timestamp of the file that the buffer was read from.
+        self._nbytes = 0      # Resident bytes accounted by the parent.
+        self._version = 0     # Counter of the buffer modification.
+        self._cuts_key = None
+        self._out = None
+        bins, vlim, img = self._to_image(preview)
         self.artist = parent.axes.imshow(img,
                                          cmap=cm.gray,
                                          aspect='equal',  # cf. aspect_ratio => xy_unit
@@ -183,9 +392,16 @@ class AxesImagePhantom:
                                          visible=show,
                                          picker=True,
                                          )
-        self.bins = bins  # Binning value resulting from the image byte limit.
+        self.bins = bins  # Binning value of the displayed image.
         self.cuts = vlim  # Lower/Upper cutoff values of the buffer.
         self.aspect_ratio = 1
+        
+        self._image = img     # Preview image of the whole buffer.
+        self._binning = bins  # Binning value resulting from the image byte limit.
+        self._levels = {}     # Image pyramid {n: n-binning level}.
+        self._window = None   # Pyramid level and window being displayed.
+        self._prefetched = None  # Window and the image prepared in advance.
+        self._spillname = None
         self.update_extent()
 
     def __getattr__(self, attr):
@@ -195,6 +411,11 @@ class AxesImagePhantom:
         ## Called in `on_pick` and `__contains__` to check objects in.
         return x is self.artist
 
+    def remove(self):
+        """Remove the artist from the axes, if attached (override)."""
+        if self.artist.axes is not None:
+            self.artist.remove()
+
     def update_attr(self, attr):
         """Update frame-specifc attributes."""
         if not attr:
@@ -206,6 +427,7 @@ class AxesImagePhantom:
         if 'pathname' in attr:
             self._pathname = attr['pathname']
             self._mtime = _get_timestamp(self._pathname)
+            self.parent._update_index(self)
             flag |= FLAG_ANNOTATION
         
         if 'annotation' in attr:
@@ -240,28 +462,268 @@ class AxesImagePhantom:
         if flag:
             self.parent.handler('frame_updated', self)
 
-    def update_buffer(self, buf=None):
+    def update_buffer(self, buf=None, preview=None):
         """Update buffer and the image (internal use only)."""
         if buf is not None:
-            self.buffer = _to_buffer(buf)
+            self.buffer = _to_buffer(buf, lazy=self.parent.lazy_loading)
+        self._backed = None
+        self._version += 1
         
-        bins, vlim, img = _to_image(self.buffer,
-                                    cutoff=self.parent.cutoff_threshold,
-                                    threshold=self.parent.nbytes_threshold,
-                                    )
-        self.artist.set_array(img)
-        self.bins = bins
+        bins, vlim, img = self._to_image(preview)
         self.cuts = vlim
+        self._image = img
+        self._binning = bins
+        self.release()
+        self._show_preview()
+        self.parent._account(self)
         self.parent.handler('frame_modified', self)
 
+    def _to_image(self, preview=None):
+        """Convert the buffer to the preview image (internal use only).
+        The cutoff values are reused while the buffer version and the conditions
+        are unchanged (`update_buffer` always bumps the version).
+        If the preview converted in advance is given, it is used as it is.
+        Note: The preview image is overwritten when converted again.
+        """
+        parent = self.parent
+        key = (parent.cutoff_threshold,
+               parent.nbytes_threshold,
+               parent.cutoff_method,
+               self._version)
+        if preview is None:
+            if key == self._cuts_key:
+                cutoff = self.cuts
+            else:
+                cutoff = parent.cutoff_threshold
+            preview = _to_image(self.buffer,
+                                cutoff=cutoff,
+                                threshold=parent.nbytes_threshold,
+                                method=parent.cutoff_method,
+                                out=self._out,
+                                )
+        self._cuts_key = key
+        ## The output is reused unless the preview is the buffer itself.
+        img = preview[2]
+        self._out = img if img is not self._buffer else None
+        return preview
+
     def update_extent(self):
         """Update logical extent of the image (internal use only)."""
-        h, w = self.buffer.shape[:2]
+        h, w = self.buffer_spec[0][:2]
         ux, uy = self.xy_unit
         w *= ux/2
         h *= uy/2
         cx, cy = self.center
-        self.artist.set_extent((cx-w, cx+w, cy-h, cy+h))
+        self._extent = (cx-w, cx+w, cy-h, cy+h)
+        self._show_preview()
+
+    def _show_preview(self):
+        self._window = None
+        self.artist.set_array(self.image)
+        if self.artist.axes is not None:  # cf. parent.detached_artists
+            self.artist.set_extent(self._extent)
+        self.bins = self._binning
+
+    def get_level(self, n, buf=None, levels=None):
+        """Get the n-binning level of the image pyramid.
+        The level is built from the finer one when it is first requested.
+        If `buf` and `levels` are given, they are used instead of the frame's.
+        """
+        if buf is None:
+            buf = self.buffer
+        if levels is None:
+            levels = self._levels
+        if n == 1:
+            return buf
+        try:
+            return levels[n]
+        except KeyError:
+            levels[n] = _to_level(self.get_level(n//2, buf, levels), 2)
+            return levels[n]
+
+    def _get_window(self, preview=None):
+        """Get the pyramid level and the visible window in the level (internal use only).
+        
+        Args:
+            preview: (binning, cuts, image) to be used instead of the frame's.
+        
+        Returns:
+            (n, i0, i1, j0, j1) or None if the view is out of the frame.
+        """
+        ## Select the level as n <= [pix/dots] in power of 2.
+        dots = self.xy_ddpx[0]
+        n = 2 ** int(np.log2(1/dots)) if 0 < dots < 1 else 1
+        
+        ## Visible window [x0:x1, y0:y1] in pixels.
+        h, w = self.buffer_spec[0][:2]
+        l, r, b, t = self._extent
+        ux, uy = self.xy_unit
+        xa, xb = sorted(self.parent.xlim)
+        ya, yb = sorted(self.parent.ylim)
+        x0 = max(0, int((xa - l) / ux))
+        x1 = min(w, int(np.ceil((xb - l) / ux)))
+        y0 = max(0, int((t - yb) / uy))
+        y1 = min(h, int(np.ceil((t - ya) / uy)))
+        if x0 >= x1 or y0 >= y1:
+            return None
+        
+        ## Restrict the window size by the image byte limit.
+        margin = self.parent.viewport_margin
+        while (x1 - x0) * (y1 - y0) * (1 + 2*margin)**2 > self.parent.nbytes_threshold * n**2:
+            n *= 2
+        binning = preview[0] if preview else self._binning
+        n = min(n, binning)  # The preview has enough resolution.
+        
+        ## Visible window [j0:j1, i0:i1] in the level.
+        sx, sy, ph, pw = self._get_scale(n, preview)
+        j0, j1 = int(x0 / sx), int(np.ceil(x1 / sx))
+        i0, i1 = int(y0 / sy), int(np.ceil(y1 / sy))
+        return (n, i0, i1, j0, j1)
+
+    def _get_scale(self, n, preview=None):
+        ## Pixel size (sx, sy) and shape (ph, pw) of the level n.
+        h, w = self.buffer_spec[0][:2]
+        binning, _cuts, image = preview or (self._binning, self.cuts, None)
+        if n == binning:
+            ph, pw = (image if image is not None else self.image).shape[:2]
+            return w / pw, h / ph, ph, pw
+        return n, n, h // n, w // n
+
+    def _make_window(self, n, i0, i1, j0, j1, preview=None, buf=None, levels=None):
+        """Crop the window with the margin and convert it to the image (internal use only).
+        
+        The preview, buffer, and levels can be given instead of the frame's,
+        so that the window is made without modifying the frame (cf. prefetch).
+        
+        Returns:
+            window: (n, i0, i1, j0, j1) expanded by the margin.
+            image: array<uint8> of the window.
+        """
+        margin = self.parent.viewport_margin
+        binning, cuts, image = preview or (self._binning, self.cuts, None)
+        sx, sy, ph, pw = self._get_scale(n, preview)
+        di = int((i1 - i0) * margin)
+        dj = int((j1 - j0) * margin)
+        i0, i1 = max(0, i0 - di), min(ph, i1 + di)
+        j0, j1 = max(0, j0 - dj), min(pw, j1 + dj)
+        if n == binning:
+            img = (image if image is not None else self.image)[i0:i1, j0:j1]
+        else:
+            src = self.get_level(n, buf, levels)[i0:i1, j0:j1]
+            _bins, _vlim, img = _to_image(src, cutoff=cuts)
+        return (n, i0, i1, j0, j1), img
+
+    def update_viewport(self):
+        """Select the pyramid level and crop the visible part of the image.
+        Called from parent.OnDraw.
+        
+        The image is cropped with the margin of `parent.viewport_margin` and
+        is not converted again while the view stays within the window.
+        """
+        v = self._get_window()
+        if v is None:
+            return  # The view is out of the frame.
+        n = v[0]
+        if n == self._binning and not self.parent.viewport_mode:
+            if self._window is not None:
+                self._show_preview()
+            return
+        if _within(v, self._window):
+            return  # The view is within the window.
+        if _within(v, self._prefetched and self._prefetched[0]):
+            window, img = self._prefetched
+        else:
+            window, img = self._make_window(*v)
+        self._prefetched = None
+        
+        n, i0, i1, j0, j1 = self._window = window
+        sx, sy, ph, pw = self._get_scale(n)
+        l, r, b, t = self._extent
+        ux, uy = self.xy_unit
+        self.artist.set_array(img)
+        self.artist.set_extent((l + j0*sx*ux, l + j1*sx*ux,
+                                t - i1*sy*uy, t - i0*sy*uy))
+        self.bins = n
+
+    def prefetch(self):
+        """Prepare the buffer, the preview, and the window in advance.
+        Called from worker threads of the parent.
+        
+        The evicted buffer is read again, and the preview and the window for
+        the current view are made, into local values without modifying the
+        frame. They are published by `publish` in the main thread.
+        
+        Returns:
+            (nbytes, result) to be published, or None if nothing to prepare.
+        """
+        parent = self.parent
+        version = self._version
+        buf = self._buffer
+        nbytes = 0
+        if buf is None:
+            if not self.pathname:
+                return None
+            buf = _to_buffer(parent.read_buffer(self.pathname), lazy=parent.lazy_loading)
+            if not isinstance(buf, np.memmap):
+                nbytes += buf.nbytes
+        preview = None
+        if self._image is None:
+            preview = _to_image(buf,
+                                cutoff=parent.cutoff_threshold,
+                                threshold=parent.nbytes_threshold,
+                                method=parent.cutoff_method,
+                                )
+            nbytes += preview[2].nbytes
+        pv = preview or (self._binning, self.cuts, self._image)
+        levels = self._levels.copy()
+        window = None
+        v = self._get_window(pv)
+        if v is not None and v[0] < pv[0]:
+            if not _within(v, self._window)\
+              and not _within(v, self._prefetched and self._prefetched[0]):
+                window = self._make_window(*v, preview=pv, buf=buf, levels=levels)
+                nbytes += window[1].nbytes
+        for n, a in levels.items():
+            if n not in self._levels:
+                nbytes += a.nbytes
+        if buf is self._buffer and preview is None and window is None:
+            return None
+        return nbytes, (version, buf, preview, levels, window)
+
+    def publish(self, result):
+        """Publish the result of `prefetch` to the frame (internal use only).
+        Called in the main thread.
+        
+        Returns:
+            False if the buffer has been modified since prefetched.
+        """
+        version, buf, preview, levels, window = result
+        if version != self._version:
+            return False
+        if self._buffer is None:
+            self.buffer = buf
+        elif self._buffer is not buf:
+            return False
+        if preview is not None and self._image is None:
+            self._binning, self.cuts, self._image = preview
+        for n, a in levels.items():
+            self._levels.setdefault(n, a)
+        if window is not None:
+            self._prefetched = window
+        return True
+
+    def release(self):
+        """Release the image pyramid and the prefetched window."""
+        self._levels = {}
+        self._prefetched = None
+
+    @property
+    def nbytes_cached(self):
+        """The number of bytes held by the pyramid and the prefetched window."""
+        n = sum(a.nbytes for a in self._levels.values())
+        if self._prefetched:
+            n += self._prefetched[1].nbytes
+        return n
 
     def update_interpolation_mode(self):
         """Called from parent.OnDraw."""
@@ -273,9 +735,96 @@ class AxesImagePhantom:
             if dots > 1:
                 self.artist.set_interpolation('nearest')
 
-    image = property(
-        lambda self: self.artist.get_array(),
-        doc="Displayed image array<uint8>.")
+    @property
+    def buffer(self):
+        """Buffer array of the frame (read again if evicted)."""
+        if self._buffer is None:
+            self.buffer = _to_buffer(self.parent.read_buffer(self.pathname),
+                                     lazy=self.parent.lazy_loading)
+        return self._buffer
+
+    @buffer.setter
+    def buffer(self, v):
+        self._buffer = v
+        self._buffer_spec = (v.shape, v.dtype)
+        self.parent._update_index(self)
+        self.parent._account(self)
+
+    @property
+    def buffer_spec(self):
+        """Shape and dtype of the buffer (without reading evicted one)."""
+        return self._buffer_spec
+
+    def peek_buffer(self):
+        """Buffer array of the frame (without reading evicted one into memory).
+        
+        The evicted buffer is mapped from the file if possible, otherwise read
+        temporarily; in either case, it is not kept in the frame.
+        """
+        if self._buffer is None:
+            return _to_buffer(self.parent.read_buffer(self.pathname), lazy=True)
+        return self._buffer
+
+    @property
+    def image(self):
+        """Preview image array<uint8> of the whole buffer."""
+        if self._image is None:
+            self._binning, self.cuts, self._image = self._to_image()
+        return self._image
+
+    @property
+    def residency(self):
+        """Where the buffer resides: 'memory', 'mapped', 'spilled', or 'evicted'."""
+        buf = self._buffer
+        if buf is None:
+            return 'evicted'
+        if isinstance(buf, np.memmap):
+            return 'spilled' if buf.filename == self._spillname else 'mapped'
+        return 'memory'
+
+    @property
+    def nbytes_resident(self):
+        """The number of bytes held in memory by the frame."""
+        n = self.nbytes_cached
+        if self.residency == 'memory':
+            n += self._buffer.nbytes
+        if self._image is not None:
+            n += self._image.nbytes
+        if self._out is not None and self._out is not self._image:
+            n += self._out.nbytes  # output kept for the next conversion
+        return n
+
+    def evict(self):
+        """Drop the buffer (and the preview) from the memory (internal use only).
+        
+        The buffer is read again from the file when accessed, if it has not been
+        modified since loaded. Otherwise, it is spilled to a temporary npy file.
+        
+        Returns:
+            The number of bytes freed.
+        """
+        n = self.nbytes_resident
+        self.release()
+        if self.residency == 'memory':
+            if self._backed and self._backed == _get_readable_timestamp(self.pathname):
+                self._buffer = None
+                self.parent._update_index(self)
+            else:
+                self.buffer = self.parent._spill_buffer(self._buffer)
+                self._spillname = self._buffer.filename
+        if self.parent.evict_preview and not self.artist.get_visible():
+            self._image = None
+            self._out = None
+            self._window = None
+            self.artist.set_array(np.zeros((1, 1), np.uint8))
+        self.parent.handler('frame_updated', self)
+        return n - self.nbytes_resident
+
+    def get_extent(self):
+        """Logical extent of the frame (override).
+        Note: The artist extent can be a part of the frame.
+        """
+        return self._extent
 
     clim = property(
         lambda self: self.artist.get_clim(),
@@ -286,6 +835,10 @@ class AxesImagePhantom:
         lambda self: self._attributes,
         doc="Auxiliary info about the frame.")
 
+    version = property(
+        lambda self: self._version,
+        doc="Version of the buffer, incremented each time the buffer is updated.")
+
     @property
     def name(self):
         return self._name
@@ -293,6 +846,7 @@ class AxesImagePhantom:
     @name.setter
     def name(self, v):
         self._name = v
+        self.parent._update_index(self)
         self.parent.handler('frame_updated', self)
 
     pathname = property(
@@ -412,7 +966,7 @@ class AxesImagePhantom:
             # warn("Setting xy data with single tuple.", DeprecationWarning)
             x, y = x
         x, y = _to_array(x), _to_array(y)
-        l,r,b,t = self.artist.get_extent()
+        l,r,b,t = self._extent
         ux, uy = self.xy_unit
         nx = (x - l) / ux
         ny = (t - y) / uy  # Y ピクセルインデクスは座標と逆
@@ -427,7 +981,7 @@ class AxesImagePhantom:
             # warn("Setting xy data with single tuple.", DeprecationWarning)
             nx, ny = nx
         nx, ny = _to_array(nx), _to_array(ny)
-        l,r,b,t = self.artist.get_extent()
+        l,r,b,t = self._extent
         ux, uy = self.xy_unit
         x = l + (nx + 0.5) * ux
         y = t - (ny + 0.5) * uy  # Y ピクセルインデクスは座標と逆
@@ -687,6 +1241,20 @@ class GraphPlot(MatplotPanel):
         self._frames = []
         self._index = None
         
+        ## Lookup index of frames {key: [frames]} by name, pathname, and id(buffer).
+        self.__tables = ({}, {}, {})
+        self.__pos = {}   # {id(frame): position}
+        self.__uniq = {}  # {basename: last suffix} for unique names
+        
+        self.__prefetcher = None  # Worker thread to prepare the frames ahead.
+        self.__prefetched = {}    # Frames prepared by the worker {id: frame}.
+        self.__prefetch_key = 0
+        
+        self.__shown = None  # The frame being shown.
+        self.__spilldir = None  # Temporary directory to spill buffers.
+        self.__lru = OrderedDict()  # Frames holding buffers {id: frame} in order shown.
+        self.__nbytes = 0  # Running total of the resident bytes of frames.
+        
         ## cf. self.figure.dpi = 80 dpi (0.3175 mm/pix)
         self._unit = 1.0
         
@@ -718,7 +1286,24 @@ class GraphPlot(MatplotPanel):
     ## External I/O support for frames.
     ## --------------------------------
 
-    def load(self, buf, name=None, pos=None, show=True, **kwargs):
+    def convert_buffer(self, buf):
+        """Convert a buffer to the array and the preview image.
+        
+        This does not touch the frames and the canvas, so that it can be
+        called from worker threads prior to `load` in the main thread.
+        
+        Returns:
+            buffer: array (or memmap in lazy loading mode).
+            preview: (bins, cuts, image<uint8>) to be passed to `load`.
+        """
+        buf = _to_buffer(buf, lazy=self.lazy_loading)
+        return buf, _to_image(buf,
+                              cutoff=self.cutoff_threshold,
+                              threshold=self.nbytes_threshold,
+                              method=self.cutoff_method,
+                              )
+
+    def load(self, buf, name=None, pos=None, show=True, preview=None, **kwargs):
         """Load a buffer with a name.
         
         Args:
@@ -726,39 +1311,53 @@ class GraphPlot(MatplotPanel):
             name: buffer name (default to *temp*).
             pos:  Insertion position in the frame list.
             show: Show immediately when loaded.
+            preview: (bins, cuts, image) converted in advance (cf. `convert_buffer`).
             **kwargs: frame attributes.
         """
         assert buf is not None, "Load buffer must be an array or path:str (not None)"
         
         if isinstance(buf, str):
-            buf = Image.open(buf)
+            buf = _read_buffer(buf)
         
         path = kwargs.get('pathname')
-        paths = [art.pathname for art in self._frames]
-        names = [art.name for art in self._frames]
-        j = -1
+        names, paths, _bufs = self.__tables
         if path:
-            if path in paths:
-                j = paths.index(path)  # existing path
-        elif name in names:
-            j = names.index(name)  # existing frame
-        if j != -1:
-            art = self._frames[j]
-            art.update_buffer(buf)   # => [frame_modified]
+            art = self.__lookup(paths, path)  # existing path
+        else:
+            art = self.__lookup(names, name)  # existing frame
+        if art is not None:
+            j = self.__pos[id(art)]
+            art.update_buffer(buf, preview)  # => [frame_modified]
             art.update_attr(kwargs)  # => [frame_updated] localunit => [canvas_draw]
+            art._backed = _get_readable_timestamp(path)
             art.update_extent()
             if show:
                 self.select(j)
             return art
         
-        name = _get_uniqname(name or "*temp*", names)
+        name = _get_uniqname(name or "*temp*", names, self.__uniq)
         
         ## The first load of axes.imshow (=> self.axes.axis 表示を更新する).
-        art = AxesImagePhantom(self, buf, name, show, **kwargs)
+        art = AxesImagePhantom(self, buf, name, show, preview, **kwargs)
+        
+        art._backed = _get_readable_timestamp(path)
+        
+        if not show and self.detached_artists:
+            art.remove()
         
         j = len(self) if pos is None else pos
         self._frames.insert(j, art)
+        if j < len(self) - 1:
+            self._reindex()
+        else:
+            self.__pos[id(art)] = len(self) - 1
+            self._update_index(art)
+        self.__lru[id(art)] = art
+        self.__lru.move_to_end(id(art), last=False)  # Not shown yet.
+        self._account(art)
         self.handler('frame_loaded', art)
+        if not show:
+            self.evict_frames()
         if show:
             u = self.frame and self.frame.unit  # current frame unit
             self.select(j)
@@ -773,17 +1372,29 @@ class GraphPlot(MatplotPanel):
         else:
             j = index
         
-        for art in self._frames:  # Hide all frames
-            art.set_visible(0)
+        art = self._frames[j] if j is not None and self._frames else None
+        if self.__shown is not art:
+            if self.__shown is not None:  # Hide the previous frame only.
+                self.__shown.set_visible(0)
+                self._account(self.__shown)  # The cache may have grown while shown.
+                if self.detached_artists:
+                    self.__shown.remove()
+            self.__shown = art
         
         if j != self._index and self._index is not None:
             self.handler('frame_hidden', self.frame)
         
-        if j is not None and self._frames:
-            art = self._frames[j]
+        if art is not None:
+            self.__lru[id(art)] = art
+            self.__lru.move_to_end(id(art))
+            if art.artist.axes is None:
+                self.axes.add_image(art.artist)  # Attach the detached artist.
+            if art._window is None:
+                art._show_preview()  # The preview may have been evicted or detached.
             art.set_visible(1)
             self._index = j % len(self)
             self.handler('frame_shown', art)
+            self.evict_frames()
         else:
             self._index = None
         
@@ -800,10 +1411,11 @@ class GraphPlot(MatplotPanel):
         if isinstance(j, str):
             j = self.index(j)
         
-        buffers = [art.buffer for art in self._frames]
         if hasattr(j, '__iter__'):
-            return [buffers[i] for i in j]
-        return buffers[j]  # j can also be slicing
+            return [self._frames[i].buffer for i in j]
+        if isinstance(j, slice):
+            return [art.buffer for art in self._frames[j]]
+        return self._frames[j].buffer
 
     def __setitem__(self, j, v):
         if v is None:
@@ -835,7 +1447,12 @@ class GraphPlot(MatplotPanel):
             indices = [art.index for art in arts]  # frames to be removed
             for art in arts:
                 art.remove()
-                self._frames.remove(art)
+                self.__lru.pop(id(art), None)
+                self.__nbytes -= art._nbytes
+                art._nbytes = 0
+            removed = set(map(id, arts))
+            self._frames[:] = [art for art in self._frames if id(art) not in removed]
+            self._reindex()
             self.handler('frame_removed', indices)
             
             j = self._index
@@ -857,39 +1474,83 @@ class GraphPlot(MatplotPanel):
         return True
 
     def __contains__(self, j):
-        if isinstance(j, str):
-            return j in (art.name for art in self._frames)
-        elif isinstance(j, np.ndarray):
-            return any(j is art.buffer for art in self._frames)
+        if isinstance(j, (str, np.ndarray)):
+            return self.__find(j) is not None
+        elif isinstance(j, AxesImagePhantom):
+            return id(j) in self.__pos
         else:
             return (j in self._frames)
 
     def index(self, j):
-        if isinstance(j, str):
-            return next(i for i, art in enumerate(self._frames) if j == art.name)
-        elif isinstance(j, np.ndarray):
-            return next(i for i, art in enumerate(self._frames) if j is art.buffer)
+        if isinstance(j, (str, np.ndarray)):
+            art = self.__find(j)
+            if art is None:
+                raise StopIteration
+            return self.__pos[id(art)]
+        elif isinstance(j, AxesImagePhantom):
+            try:
+                return self.__pos[id(j)]
+            except KeyError:
+                raise ValueError(f"{j!r} is not in list")
         else:
             return self._frames.index(j)  # j:frame -> int
 
     def find_frame(self, j):
-        if isinstance(j, str):
-            return next((art for art in self._frames if j == art.name), None)
-        elif isinstance(j, np.ndarray):
-            return next((art for art in self._frames if j is art.buffer), None)
+        if isinstance(j, (str, np.ndarray)):
+            return self.__find(j)
         else:
             return self._frames[j]  # j:int -> frame
 
     def get_all_frames(self, j=None):
         if isinstance(j, str):
-            return iter(art for art in self._frames if j == art.name)
+            arts = self.__tables[0].get(j, [])
         elif isinstance(j, np.ndarray):
-            return iter(art for art in self._frames if j is art.buffer)
+            arts = self.__tables[2].get(id(j), [])
         else:
             return iter(self._frames)  # j:any -> frames
+        return iter(sorted(arts, key=lambda a: self.__pos[id(a)]))
 
     def sort_frames(self, seq):
         self._frames[:] = [self._frames[i] for i in seq]  # Sort arts by new sequence for IDs.
+        self._reindex()
+
+    def __find(self, j):
+        ## Find the first frame by name:str or buffer:ndarray.
+        if isinstance(j, str):
+            return self.__lookup(self.__tables[0], j)
+        return self.__lookup(self.__tables[2], id(j))
+
+    def __lookup(self, table, key):
+        arts = table.get(key)
+        if arts:
+            return min(arts, key=lambda a: self.__pos[id(a)])
+        return None
+
+    def _update_index(self, art):
+        """Update the lookup index of the frame (internal use only).
+        Called when the name, pathname, or buffer of the frame changes.
+        """
+        if id(art) not in self.__pos:
+            return
+        for table, key in zip(self.__tables, art._keys):
+            if key is not None:
+                arts = table[key]
+                arts[:] = [x for x in arts if x is not art]
+                if not arts:
+                    del table[key]
+        buf = art._buffer
+        art._keys = (art.name, art.pathname, id(buf) if buf is not None else None)
+        for table, key in zip(self.__tables, art._keys):
+            if key is not None:
+                table.setdefault(key, []).append(art)
+
+    def _reindex(self):
+        """Rebuild the lookup index of all frames (internal use only)."""
+        self.__pos = {id(art): i for i, art in enumerate(self._frames)}
+        self.__tables = ({}, {}, {})
+        for art in self._frames:
+            art._keys = ()
+            self._update_index(art)
 
     ## --------------------------------
     ## Property of frame / drawer.
@@ -898,9 +1559,34 @@ class GraphPlot(MatplotPanel):
     ## Image byte limit for loading matplotlib (with wxAgg backend).
     nbytes_threshold = 24e6
 
+    ## Draw only the visible window of the image (+margin ratio to the view size).
+    viewport_mode = True
+    viewport_margin = 0.5
+
+    ## Map uncompressed image files onto the memory instead of reading.
+    lazy_loading = False
+
+    ## Attach only the artist of the frame shown to the axes.
+    detached_artists = False
+
+    ## Memory limit of the frames held in memory [bytes] (None: unlimited).
+    max_resident_bytes = None
+
+    ## Evict the preview images as well as the buffers.
+    evict_preview = False
+
+    ## Number of frames to prepare ahead in the direction of paging.
+    prefetch_depth = 4
+
+    ## Memory limit of the frames prepared ahead [bytes].
+    prefetch_max_bytes = 256e6
+
     ## Image cutoff limit percentiles.
     cutoff_threshold = 0.005
 
+    ## Percentile estimator of the cutoff ('exact' or 'histogram').
+    cutoff_method = 'histogram'
+
     ## Default interpolation mode for antialiasing.
     interpolation_mode = 'bilinear'
 
@@ -1070,6 +1756,107 @@ class GraphPlot(MatplotPanel):
                     unit=self.unit
                 ))
 
+    def prefetch(self, direction=1):
+        """Prepare the frames ahead of the current frame in the background.
+        
+        Args:
+            direction: +1 for the next pages, -1 for the previous pages.
+        
+        Note:
+            The frames prepared previously but no longer ahead are released.
+            The preparation stops when the cached bytes exceed `prefetch_max_bytes`.
+            Evicted frames ahead are read again, and are not evicted while ahead.
+            The worker does not touch the frames; the results are published
+            in the main thread, unless the task or the buffer is outdated.
+        """
+        self.__prefetch_key += 1  # Cancel the preceding task.
+        j = self._index
+        if j is None:
+            return
+        ahead = [self._frames[k] for k in range(j + direction,
+                                                j + direction * (self.prefetch_depth + 1),
+                                                direction) if 0 <= k < len(self)]
+        for k, art in list(self.__prefetched.items()):
+            if art is not self.frame and all(art is not x for x in ahead):
+                art.release()
+                self._account(art)
+                del self.__prefetched[k]
+        if not ahead:
+            return
+        if not self.__prefetcher:
+            self.__prefetcher = ThreadPoolExecutor(1)
+        self.__prefetcher.submit(self._prefetch, ahead, self.__prefetch_key)
+
+    def _prefetch(self, frames, key):
+        ## Called in the worker thread.
+        ## The results are published in the main thread.
+        nbytes = 0
+        for art in frames:
+            if key != self.__prefetch_key or nbytes > self.prefetch_max_bytes:
+                break
+            try:
+                ret = art.prefetch()
+            except Exception as e:
+                print("- Failed to prefetch {!r}: {}".format(art.name, e))
+                continue
+            if ret is not None:
+                nbytes += ret[0]
+                wx.CallAfter(lambda art=art, res=ret[1]:
+                                self and self._publish(art, res, key))
+
+    def _publish(self, art, result, key):
+        ## Called in the main thread.
+        ## The results of the task cancelled or of the frames deleted are discarded.
+        if key == self.__prefetch_key and id(art) in self.__pos:
+            if art.publish(result):
+                self.__prefetched[id(art)] = art
+                self._account(art)
+
+    @staticmethod
+    def read_buffer(path):
+        """Read buffer from the path to reload evicted frames (to be overridden)."""
+        return _read_buffer(path)
+
+    def evict_frames(self):
+        """Evict the buffers of frames least recently shown to keep `max_resident_bytes`.
+        The current frame is never evicted.
+        
+        The resident bytes are kept as a running total, and only the frames
+        holding buffers are visited in the order shown (least recent first).
+        """
+        if self.max_resident_bytes is None:
+            return
+        if self.frame:
+            self._account(self.frame)  # The cache may have grown while shown.
+        for art in list(self.__lru.values()):
+            if self.__nbytes <= self.max_resident_bytes:
+                break
+            if art is not self.frame and id(art) not in self.__prefetched:
+                art.evict()
+                self._account(art)
+                del self.__lru[id(art)]
+
+    def _account(self, art):
+        """Update the running total of the resident bytes (internal use only).
+        Called when the buffer or the cache of the frame is changed.
+        """
+        if id(art) not in self.__pos:
+            return  # The frame is being loaded or has been removed.
+        n = art.nbytes_resident
+        self.__nbytes += n - art._nbytes
+        art._nbytes = n
+        if art._buffer is not None:
+            self.__lru.setdefault(id(art), art)  # The buffer was read again.
+
+    def _spill_buffer(self, buf):
+        """Save the buffer to a temporary npy file and map it (internal use only)."""
+        if not self.__spilldir:
+            self.__spilldir = TemporaryDirectory(prefix="mwx-")
+        fd, path = mkstemp(suffix=".npy", dir=self.__spilldir.name)
+        with os.fdopen(fd, 'wb') as o:
+            np.save(o, buf)
+        return np.load(path, mmap_mode='c')
+
     def refresh(self):
         if self.frame:
             self.frame.update_buffer()
@@ -1081,6 +1868,8 @@ class GraphPlot(MatplotPanel):
             self.infobar.Dismiss()
         elif self.frame:
             self.infobar.ShowMessage(self.frame.annotation)
+        if self.frame:
+            self.frame.update_viewport()  # Substitutes internal_callback.
         self.draw(internal_callback=False)
 
     def update_infobar(self):
@@ -1219,6 +2008,7 @@ class GraphPlot(MatplotPanel):
     def OnDraw(self, evt):
         """Called before the canvas is drawn (override)."""
         if self.frame:
+            self.frame.update_viewport()
             self.frame.update_interpolation_mode()
 
     def OnMotion(self, evt):
@@ -1231,12 +2021,14 @@ class GraphPlot(MatplotPanel):
         i = self._index
         if i is not None and i < len(self)-1:
             self.select(i + 1)
+            self.prefetch(+1)
 
     def OnPageUp(self, evt):
         """Previous page."""
         i = self._index
         if i is not None and i > 0:
             self.select(i - 1)
+            self.prefetch(-1)
 
     def OnHomePosition(self, evt):
         self.fit_to_axes()
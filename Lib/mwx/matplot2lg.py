@@ -1,8 +1,14 @@
 #! python3
 """mwxlib line plot for images.
 """
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import OrderedDict
 from itertools import chain
+import threading
+import warnings
+import weakref
 import io
+import os
 import wx
 
 from matplotlib import patches
@@ -17,6 +23,55 @@ from .matplot2 import MatplotPanel
 from .matplot2 import NORMAL, MARK, LINE, REGION
 
 
+class MinMaxPyramid:
+    """Multi-level min/max pyramid of a 1D trace.
+    
+    Each level halves the previous one by taking the min and max of the pairs.
+    The envelope of a range is taken from the level whose blocks are just
+    smaller than a screen column, so it costs the number of columns,
+    not the number of samples in the range.
+    
+    Attributes:
+        x, y: full-resolution data (x must be in ascending order)
+        levels: list of (mins, maxs) of the blocks of size 2**k
+    """
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.levels = [(y, y)]
+        lo = hi = y
+        while len(lo) > 1:
+            n = len(lo) // 2 * 2
+            a = np.fmin(lo[0:n:2], lo[1:n:2])
+            b = np.fmax(hi[0:n:2], hi[1:n:2])
+            if n < len(lo):
+                a = np.append(a, lo[-1])
+                b = np.append(b, hi[-1])
+            self.levels.append((a, b))
+            lo, hi = a, b
+
+    def envelope(self, x0, x1, ncols):
+        """Get the min/max envelope of the range [x0, x1] in ncols columns.
+        
+        Returns:
+            (xs, ys) with two points (min, max) per column,
+            or the raw data if the range has no more than 2*ncols points.
+        """
+        x = self.x
+        i = max(0, x.searchsorted(x0) - 1)  # including the points outside
+        j = min(len(x), x.searchsorted(x1, 'right') + 1)
+        if j - i <= 2 * ncols:
+            return x[i:j], self.y[i:j]
+        k = min(int(np.log2((j - i) / ncols)), len(self.levels) - 1)
+        lo, hi = self.levels[k]
+        edges = np.unique(np.linspace(i, j, ncols + 1)[:-1].astype(int) >> k)
+        stop = ((j - 1) >> k) + 1
+        a = np.fmin.reduceat(lo[:stop], edges)
+        b = np.fmax.reduceat(hi[:stop], edges)
+        xs = x[np.maximum(edges << k, i)]
+        return np.repeat(xs, 2), np.column_stack((a, b)).ravel()
+
+
 class LinePlot(MatplotPanel):
     """Line plot 1D base panel.
     
@@ -59,6 +114,10 @@ class LinePlot(MatplotPanel):
         # <matplotlib.patches.Rectangle>
         self._vspan = self.axes.axvspan(0, 0, color='none', ls='dashed', lw=1, ec='black',
                                         visible=0, zorder=2)
+        
+        self._traces = {}  # Min/max pyramids of the decimated lines.
+        
+        self.axes.callbacks.connect('xlim_changed', lambda v: self.decimate())
 
     @property
     def overlay_artists(self):
@@ -66,6 +125,46 @@ class LinePlot(MatplotPanel):
                 self._vspan, *self._annotations,
                 ]
 
+    ## The lines longer than this are drawn decimated (None: never).
+    decimation_threshold = 4096
+
+    def set_line_data(self, art, x, y):
+        """Set the data of the line.
+        
+        If the line is longer than `decimation_threshold`, the min/max envelope
+        per screen column is drawn instead, and updated when xlim changes.
+        The full-resolution data can be got by `get_line_data`.
+        """
+        x = np.asarray(x)
+        y = np.asarray(y)
+        n = self.decimation_threshold
+        if n is not None and len(x) > n and (x[1:] >= x[:-1]).all():
+            self._traces[art] = MinMaxPyramid(x, y)
+            self.decimate()
+        else:
+            self._traces.pop(art, None)
+            art.set_data(x, y)
+
+    def get_line_data(self, art):
+        """Full-resolution (xdata, ydata) of the line."""
+        trace = self._traces.get(art)
+        if trace is not None:
+            return trace.x, trace.y
+        return art.get_data(orig=0)
+
+    def decimate(self):
+        """Update the decimated lines to the current xlim and the axes width."""
+        if not self._traces:
+            return
+        x0, x1 = sorted(self.xlim)
+        ncols = max(1, int(self.axes.bbox.width))
+        for art, trace in self._traces.items():
+            art.set_data(*trace.envelope(x0, x1, ncols))
+
+    def OnDraw(self, evt):
+        """Called before the canvas is drawn (override)."""
+        self.decimate()
+
     ## The limit for dragging region.
     boundary = None
 
@@ -210,12 +309,346 @@ class LinePlot(MatplotPanel):
         self.region = None
 
 
+def _log_complex(z):
+    if z.dtype in (np.complex64, np.complex128):  # maybe fft pattern
+        return np.log(1 + abs(z))
+    return z
+
+
+def _sample_points(buf, X, Y, method):
+    """Sample the buffer at the points (X, Y) [pixel] (internal use only).
+    
+    Returns:
+        Z <float64> and the mask of the points within the buffer.
+    """
+    h, w = buf.shape[:2]
+    if method == 'nearest':
+        mask = (0 <= X) & (X < w) & (0 <= Y) & (Y < h)
+        ix = X.astype(np.intp)
+        iy = Y.astype(np.intp)
+        np.clip(ix, 0, w-1, out=ix)
+        np.clip(iy, 0, h-1, out=iy)
+        Z = _log_complex(buf[iy, ix]).astype(np.float64) * mask  # 速くてそこそこ正確
+    elif method == 'bilinear':
+        mask = (0 <= X) & (X <= w-1) & (0 <= Y) & (Y <= h-1)
+        X = np.clip(X, 0, w-1)
+        Y = np.clip(Y, 0, h-1)
+        j = np.minimum(X.astype(np.intp), max(w-2, 0))
+        i = np.minimum(Y.astype(np.intp), max(h-2, 0))
+        j1 = np.minimum(j+1, w-1)
+        i1 = np.minimum(i+1, h-1)
+        u = X - j
+        v = Y - i
+        Z = ((_log_complex(buf[i, j]) * (1-u) + _log_complex(buf[i, j1]) * u) * (1-v)
+           + (_log_complex(buf[i1, j]) * (1-u) + _log_complex(buf[i1, j1]) * u) * v) * mask
+    elif method == 'spline':
+        ## Read the bounding box of the points with a margin for the prefilter.
+        mask = (0 <= X) & (X <= w-1) & (0 <= Y) & (Y <= h-1)
+        Z = np.zeros(X.shape)
+        if mask.any():
+            m = 8
+            y0 = max(0, int(Y[mask].min()) - m)
+            x0 = max(0, int(X[mask].min()) - m)
+            y1 = min(h, int(Y[mask].max()) + m + 2)
+            x1 = min(w, int(X[mask].max()) + m + 2)
+            src = _log_complex(np.asarray(buf[y0:y1, x0:x1])).astype(np.float64)
+            Z[mask] = ndimage.map_coordinates(src, (Y[mask] - y0, X[mask] - x0),
+                                              order=3, mode='nearest')  # 遅いが正確
+    else:
+        raise ValueError(f"Unknown interpolation method: {method!r}")
+    return Z.astype(np.float64, copy=False), mask
+
+
+def sample_line(buf, nx, ny, width=1, method='nearest', reduce='mean'):
+    """Sample the line profile of the buffer across the width.
+    
+    The points on the line and its parallel offsets are sampled in a grid of
+    (N, width), where N = int(L) + 1 for the length L [pixel], in blocks of
+    the rows small enough to be cached.
+    Only the pixels needed are read, so it works with memory-mapped buffers.
+    
+    Args:
+        buf: 2D buffer
+        nx, ny: pixel coordinates of the two end points [x0, x1], [y0, y1]
+        width: line width to integrate [pixel]
+        method: interpolation `nearest`, `bilinear`, or `spline` (slow)
+        reduce: reduction across the width `mean`, `max`, or `median`
+    
+    Returns:
+        zs <float64> of size N.
+        For `mean`, the points out of the buffer are counted as zero.
+        For the others, they are ignored (zero if no points in the buffer).
+    """
+    if reduce not in ('mean', 'max', 'median'):
+        raise ValueError(f"Unknown reduction: {reduce!r}")
+    lx = nx[1] - nx[0]
+    ly = ny[1] - ny[0]
+    if lx or ly:
+        L = np.hypot(lx, ly)  # pixel length
+        nv = (-ly/L, lx/L)    # and norm vector to L
+    else:
+        L = 0
+        nv = (0, 0)
+    N = int(L) + 1
+    ks = np.arange(-(width-1)/2, (width+1)/2)
+    xs = np.linspace(nx[0], nx[1], N)
+    ys = np.linspace(ny[0], ny[1], N)
+    zs = np.zeros(N)
+    B = max(1, 16384 // width)  # rows of the block
+    for i in range(0, N, B):
+        X = xs[i:i+B,None] + ks * nv[0]
+        Y = ys[i:i+B,None] + ks * nv[1]
+        Z, mask = _sample_points(buf, X, Y, method)
+        if reduce == 'mean':
+            zs[i:i+B] = Z.sum(axis=1) / width
+            continue
+        Z[~mask] = np.nan
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # All-NaN slice
+            if reduce == 'max':
+                z = np.nanmax(Z, axis=1)
+            else:
+                z = np.nanmedian(Z, axis=1)
+        zs[i:i+B] = np.nan_to_num(z, nan=0)
+    return zs
+
+
+def sample_stack(frames, xx, yy, width=1, method='nearest', reduce='mean',
+                 max_workers=None, callback=None):
+    """Sample the line profile across the frames in worker threads.
+    
+    The line is converted to the pixel coordinates of each frame.
+    Evicted buffers are not read into memory again, but mapped from the file
+    (cf. `peek_buffer`), so only the pixels needed are read.
+    
+    Args:
+        frames: list of frames <matplot2g.AxesImagePhantom>
+        xx, yy: logical coordinates of the two end points [x0, x1], [y0, y1]
+        width: line width to integrate [pixel]
+        method: interpolation (cf. `sample_line`)
+        reduce: reduction across the width (cf. `sample_line`)
+        max_workers: the number of worker threads
+        callback: called with (i, zs) in the caller thread as each row arrives
+    
+    Returns:
+        kymograph <float64> of shape (len(frames), N), where N is the number
+        of points of the first frame. The other rows are resampled to N.
+    """
+    frames = list(frames)
+    if not frames:
+        return np.zeros((0, 0))
+    for frame in frames:
+        if len(frame.buffer_spec[0]) > 2:
+            raise ValueError(f"RGB frame {frame.name!r} cannot be profiled")
+    
+    lines = [frame.xytopixel(xx, yy) for frame in frames]
+    nx, ny = lines[0]
+    N = int(np.hypot(nx[1]-nx[0], ny[1]-ny[0])) + 1
+    dst = np.zeros((len(frames), N))
+    
+    def _sample(i):
+        nx, ny = lines[i]
+        zs = sample_line(frames[i].peek_buffer(), nx, ny, width, method, reduce)
+        if len(zs) != N:
+            zs = np.interp(np.linspace(0, 1, N), np.linspace(0, 1, len(zs)), zs)
+        return i, zs
+    
+    with ThreadPoolExecutor(max_workers, thread_name_prefix="LineProfile") as executor:
+        futures = [executor.submit(_sample, i) for i in range(len(frames))]
+        try:
+            for f in as_completed(futures):
+                i, zs = f.result()
+                dst[i] = zs
+                if callback:
+                    callback(i, zs)
+        finally:
+            for f in futures:
+                f.cancel()
+    return dst
+
+
+def _rect_diff(a, b):
+    """Split the rect a minus b into rects (y0, y1, x0, x1)."""
+    ay0, ay1, ax0, ax1 = a
+    by0, by1, bx0, bx1 = b
+    iy0, iy1 = max(ay0, by0), min(ay1, by1)
+    ix0, ix1 = max(ax0, bx0), min(ax1, bx1)
+    if iy0 >= iy1 or ix0 >= ix1:  # no intersection
+        return [a]
+    rects = [(ay0, iy0, ax0, ax1),  # upper
+             (iy1, ay1, ax0, ax1),  # lower
+             (iy0, iy1, ax0, ix0),  # left
+             (iy0, iy1, ix1, ax1)]  # right
+    return [r for r in rects if r[0] < r[1] and r[2] < r[3]]
+
+
+class HistogramEngine:
+    """Histogram of frame buffers cached per (frame, buffer version, ROI).
+    
+    The histogram is counted from the buffer in its own dtype (not the preview)
+    in the range of frame.cuts, and the levels [0:bins] are scaled to [0:255]
+    so that they correspond to the levels of the image <uint8>.
+    The raw value of a level x is ``a + (b-a) * x/255``, where (a, b) = cuts.
+    
+    Args:
+        bins: number of bins (levels)
+        maxsize: max number of histograms cached (least recently used first out)
+    
+    Note:
+        If the ROI (y0, y1, x0, x1) in pixels is moved or resized, only the
+        difference from the previous ROI of the same frame is counted.
+        Large buffers are counted in row blocks by the worker threads.
+    """
+    chunk_bytes = 4e6  # Max bytes of a row block counted at a time.
+
+    max_workers = min(4, os.cpu_count() or 1)
+
+    def __init__(self, bins=256, maxsize=64):
+        self.bins = bins
+        self.maxsize = maxsize
+        self.__cache = OrderedDict()  # {key: (frame ref, roi, counts)}
+        self.__last = {}  # The last ROI key of each frame {frame id: key}
+        self.__lock = threading.Lock()
+        self.__executor = None
+
+    def __call__(self, frame, roi=None):
+        """Get the histogram of the frame buffer.
+        
+        Args:
+            frame: AxesImagePhantom object
+            roi: (y0, y1, x0, x1) in pixels, or None (whole the buffer).
+        
+        Returns:
+            (levels, counts) of the histogram.
+        """
+        counts = self.count(frame, roi)
+        return np.linspace(0, 255, len(counts)), counts
+
+    def clear(self):
+        with self.__lock:
+            self.__cache.clear()
+            self.__last.clear()
+
+    def _key(self, frame, roi):
+        return (id(frame), frame.version, tuple(frame.cuts), roi, self.bins)
+
+    def _get(self, key, frame):
+        with self.__lock:
+            item = self.__cache.get(key)
+            if item is None or item[0]() is not frame:
+                return None
+            self.__cache.move_to_end(key)
+            return item
+
+    def _put(self, key, frame, roi, counts):
+        with self.__lock:
+            ## Keep only the last ROI of the frame, as the ROI is moved while dragging.
+            last = self.__last.get(id(frame))
+            if last is not None and last != key and last[3] is not None:
+                self.__cache.pop(last, None)
+            self.__cache[key] = (weakref.ref(frame), roi, counts)
+            self.__last[id(frame)] = key
+            while len(self.__cache) > self.maxsize:
+                self.__cache.popitem(last=False)
+            ## Forget the frames that no longer exist.
+            for k, v in list(self.__last.items()):
+                if v not in self.__cache:
+                    del self.__last[k]
+
+    def count(self, frame, roi=None):
+        """Count the histogram of the frame buffer (cached).
+        
+        Returns:
+            counts <int64> of the bins.
+        """
+        buf = frame.buffer
+        if roi is not None:
+            h, w = buf.shape[:2]
+            y0, y1, x0, x1 = map(int, roi)
+            roi = (max(0, y0), min(h, y1), max(0, x0), min(w, x1))
+        key = self._key(frame, roi)
+        item = self._get(key, frame)
+        if item is not None:
+            return item[2]
+        
+        counts = None
+        if roi is not None:
+            ## Update the histogram of the last ROI incrementally.
+            lastkey = self.__last.get(id(frame))
+            last = self._get(lastkey, frame)
+            if (last is not None and last[1] is not None
+                    and lastkey[:3] == key[:3] and lastkey[4] == key[4]):
+                prev = last[1]
+                removed = _rect_diff(prev, roi)
+                added = _rect_diff(roi, prev)
+                area = lambda rects: sum((r[1]-r[0]) * (r[3]-r[2]) for r in rects)
+                if area(removed) + area(added) < area([roi]):
+                    counts = last[2].copy()
+                    for r in removed:
+                        counts -= self._count(buf, frame.cuts, r)
+                    for r in added:
+                        counts += self._count(buf, frame.cuts, r)
+        if counts is None:
+            h, w = buf.shape[:2]
+            counts = self._count(buf, frame.cuts, roi or (0, h, 0, w))
+        self._put(key, frame, roi, counts)
+        return counts
+
+    def _count(self, buf, cuts, rect):
+        ## Count the histogram of the rect in row blocks (internal use only).
+        y0, y1, x0, x1 = rect
+        src = buf[y0:y1, x0:x1]
+        if not src.size:
+            return np.zeros(self.bins, np.int64)
+        rows = max(1, int(self.chunk_bytes // (src.nbytes / len(src))))
+        blocks = [src[i:i+rows] for i in range(0, len(src), rows)]
+        if len(blocks) > 1 and self.max_workers > 1:
+            if self.__executor is None:
+                self.__executor = ThreadPoolExecutor(self.max_workers,
+                                                     thread_name_prefix="Histogram")
+            return sum(self.__executor.map(lambda v: self._bincount(v, cuts), blocks))
+        return sum(self._bincount(v, cuts) for v in blocks)
+
+    def _bincount(self, src, cuts):
+        ## Count the levels of the block as _to_uint8 does (internal use only).
+        N = self.bins
+        if src.dtype in (np.complex64, np.complex128):  # maybe fft pattern
+            src = np.log(1 + abs(src))
+        if src.dtype == np.uint8 and N == 256 and tuple(cuts) == (0, 255):
+            return np.bincount(src.ravel(), minlength=N)
+        if src.dtype.kind in 'ui' and src.dtype.itemsize <= 2:
+            ## Count the raw values first, and then map them to the levels.
+            info = np.iinfo(src.dtype)
+            raw = np.bincount(src.ravel().astype(np.intp) - info.min,
+                              minlength=info.max - info.min + 1)
+            idx = self._levels(np.arange(info.min, info.max + 1), cuts)
+            return np.bincount(idx, weights=raw, minlength=N).astype(np.int64)
+        src = src.ravel()
+        if src.dtype.kind == 'f':
+            src = src[np.isfinite(src)]
+        return np.bincount(self._levels(src, cuts), minlength=N)
+
+    def _levels(self, src, cuts):
+        ## Convert the values to the levels [0:bins] (internal use only).
+        N = self.bins
+        a, b = cuts
+        if a >= b:
+            return np.greater(src, a).astype(np.intp) * (N-1)
+        idx = (np.asarray(src, np.float32) - np.float32(a)) * np.float32((N-1) / (b-a))
+        np.clip(idx, 0, N-1, out=idx)
+        return np.rint(idx, out=idx).astype(np.intp)
+
+
 class Histogram(LinePlot):
     """LinePlot panel for histogram (Multi-graph : Single-frame).
     
-    frame.image <uint8> (buffer ではない) を参照して，ヒストグラムをプロットする．
-    常に整数ビット画像となるので，高速なビンづめ法で計算する．
+    frame.buffer (image <uint8> ではない) を参照して，ヒストグラムをプロットする．
+    リージョンが選択されている場合はその ROI のヒストグラムを計算する．
+    buffer の cuts の範囲を image <uint8> のレベルに対応させて計算する．
+    計算結果は engine (HistogramEngine) にキャッシュされる．
     """
+    engine = HistogramEngine()
+
     def __init__(self, *args, **kwargs):
         LinePlot.__init__(self, *args, **kwargs)
         
@@ -231,6 +664,9 @@ class Histogram(LinePlot):
                  'frame_shown' : [None, self.hreplot],
               'frame_selected' : [None, self.hreplot],
               'frame_modified' : [None, self.hplot],
+                 'region_draw' : [None, self.hreplot],
+                'region_drawn' : [None, self.hreplot],
+              'region_removed' : [None, self.hreplot],
             }
         }
         self.modeline.Show(0)
@@ -239,6 +675,7 @@ class Histogram(LinePlot):
         
         self._views = []    # A list of attached view <matplot2g.GraphPlot>.
         self._frame = None  # Reference to the current frame.
+        self._data = None   # Histogram data of the current frame.
         
         # <matplotlib.lines.Line2D>
         self._plot, = self.axes.plot([], [], lw=1, color='c', alpha=1)
@@ -267,23 +704,20 @@ class Histogram(LinePlot):
         return [0, 255]
 
     def calc(self, frame):
-        BINS = 256
-        img = frame.image
-        if img.dtype == np.uint8:
-            ## 整数ビット画像は，高速なビンづめ法で計算する．
-            hist = np.bincount(img.ravel(), minlength=BINS)
-            bins = np.arange(BINS)
-        else:
-            ## hist は [min:max] 段階 (256 BINS) で保持されている．
-            ## bins は 端数含め [0:BINS] (257 コ) あるので１個減す．
-            hist, bins = np.histogram(img, BINS)
-            bins = np.linspace(img.min(), img.max(), BINS)
-        return bins, hist
+        return self.engine(frame, self.get_roi(frame))
+
+    @staticmethod
+    def get_roi(frame):
+        """ROI (y0, y1, x0, x1) in pixels of the region selected in the view."""
+        if frame.parent.region.size:
+            nx, ny = frame.region_pix
+            return (ny[1], ny[0], nx[0], nx[1])  # cf. frame.roi
+        return None
 
     def hplot(self, frame):
         self._frame = frame  # Update reference of the frame.
         if frame:
-            x, y = frame.__data = self.calc(frame)  # histogram_data buffer
+            x, y = self._data = self.calc(frame)  # new version of the buffer
             self._plot.set_data(x, y)
             self.xlim = x.min(), x.max()
             self.ylim = 0, y.max()
@@ -293,14 +727,11 @@ class Histogram(LinePlot):
     def hreplot(self, frame):
         self._frame = frame  # Update reference of the frame.
         if frame:
-            try:
-                x, y = frame.__data  # Reuse cached data.
-            except Exception:
-                x, y = frame.__data = self.calc(frame)  # new histogram_data buffer
+            x, y = self._data = self.calc(frame)  # Reuse cached data.
             
             self._plot.set_data(x, y)
             self.xlim = x.min(), x.max()
-            self.ylim = 0, y.max()
+            self.ylim = 0, max(1, y.max())  # The ROI can be empty.
             
             a, b = frame.clim
             if a != self.xlim[0] or b != self.xlim[1]:
@@ -317,7 +748,7 @@ class Histogram(LinePlot):
             return
         frame = self._frame
         if frame:
-            x, y = frame.__data
+            x, y = self._data
             if self.region is not None:
                 i, j = x.searchsorted(self.region)
             else:
@@ -343,8 +774,9 @@ class Histogram(LinePlot):
         """Draw plots and fills (override).
         Call each time the drawing should be updated.
         """
+        LinePlot.OnDraw(self, evt)
         if self._frame:
-            x, y = self._frame.__data
+            x, y = self._data
             if len(x) > 1:
                 if self.region is not None:
                     i, j = x.searchsorted(self.region)
@@ -377,9 +809,93 @@ class Histogram(LinePlot):
             self.hreplot(self._frame)
 
 
+class PeakFinder:
+    """Peak detection of 1D signals.
+    
+    The blurred signals are cached per (key, sigma), where the key identifies
+    the version of the data, so that marking peaks again at the same zoom does
+    not blur the signal again.
+    
+    Attributes:
+        maxsize: the maximum number of the blurred signals to cache
+    """
+    dtype = np.dtype([
+        ('position', np.float64),
+        ('height', np.float64),
+        ('prominence', np.float64),
+        ('width', np.float64),
+    ])
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.__cache = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def clear(self):
+        with self.__lock:
+            self.__cache.clear()
+
+    def blur(self, y, sigma, key=None):
+        """Blur the signal by the gaussian filter (cached if the key is given)."""
+        if key is None:
+            return ndimage.gaussian_filter1d(np.asarray(y, np.float64), sigma)
+        key = (key, sigma)
+        with self.__lock:
+            ys = self.__cache.get(key)
+            if ys is not None:
+                self.__cache.move_to_end(key)
+                return ys
+        ys = ndimage.gaussian_filter1d(np.asarray(y, np.float64), sigma)
+        with self.__lock:
+            self.__cache[key] = ys
+            while len(self.__cache) > self.maxsize:
+                self.__cache.popitem(last=False)
+        return ys
+
+    def find(self, x, y, sigma, prominence, key=None):
+        """Find the peaks (maxima and minima) of the blurred signal.
+        
+        Args:
+            x, y: signal data (x must be in equal spacing)
+            sigma: standard deviation of the gaussian filter [sample]
+            prominence: required prominence of the peaks
+            key: version of the data to cache the blurred signal
+        
+        Returns:
+            peaks <structured array> sorted by position.
+            The height is of the raw signal, and the prominence is negative for
+            the minima. The width is measured at the half prominence.
+        """
+        x = np.asarray(x)
+        if len(x) < 2:
+            return np.zeros(0, self.dtype)
+        ys = self.blur(y, sigma, key)
+        maxima, pa = signal.find_peaks(ys, prominence=prominence, width=0)
+        minima, pb = signal.find_peaks(-ys, prominence=prominence, width=0)
+        ux = (x[-1] - x[0]) / (len(x) - 1)
+        
+        peaks = np.zeros(len(maxima) + len(minima), self.dtype)
+        index = np.append(maxima, minima)
+        peaks['position'] = x[index]
+        peaks['height'] = np.asarray(y)[index]
+        peaks['prominence'] = np.append(pa['prominences'], -pb['prominences'])
+        peaks['width'] = np.append(pa['widths'], pb['widths']) * abs(ux)
+        return peaks[np.argsort(index, kind='stable')]
+
+    @staticmethod
+    def to_attr(peaks):
+        """Convert the peaks to a dict of the fields (for frame attributes)."""
+        return {name: peaks[name] for name in peaks.dtype.names}
+
+
 class LineProfile(LinePlot):
     """LinePlot panel for line profile (Multi-graph : Single-frame).
+    
+    Peaks are found by peak_finder (PeakFinder), which caches the blurred
+    profiles per version of the plot data.
     """
+    peak_finder = PeakFinder()
+
     def __init__(self, *args, **kwargs):
         LinePlot.__init__(self, *args, **kwargs)
         
@@ -435,6 +951,33 @@ class LineProfile(LinePlot):
             (mwx.ID_(212), "Pixel length", "Set axis-unit in pxiel base", wx.ITEM_RADIO,
                 lambda v: self.set_logic(0),
                 lambda v: v.Check(not self._logicp)),
+            (),
+            ("Interpolation", [
+                (mwx.ID_(213), "Nearest", "Sample the line by nearest interpolation", wx.ITEM_RADIO,
+                    lambda v: self.set_interp('nearest'),
+                    lambda v: v.Check(self._interp == 'nearest')),
+                    
+                (mwx.ID_(214), "Bilinear", "Sample the line by bilinear interpolation", wx.ITEM_RADIO,
+                    lambda v: self.set_interp('bilinear'),
+                    lambda v: v.Check(self._interp == 'bilinear')),
+                    
+                (mwx.ID_(215), "Spline", "Sample the line by spline interpolation", wx.ITEM_RADIO,
+                    lambda v: self.set_interp('spline'),
+                    lambda v: v.Check(self._interp == 'spline')),
+            ]),
+            ("Reduction", [
+                (mwx.ID_(216), "Mean", "Take the mean across the line width", wx.ITEM_RADIO,
+                    lambda v: self.set_reduce('mean'),
+                    lambda v: v.Check(self._reduce == 'mean')),
+                    
+                (mwx.ID_(217), "Max", "Take the max across the line width", wx.ITEM_RADIO,
+                    lambda v: self.set_reduce('max'),
+                    lambda v: v.Check(self._reduce == 'max')),
+                    
+                (mwx.ID_(218), "Median", "Take the median across the line width", wx.ITEM_RADIO,
+                    lambda v: self.set_reduce('median'),
+                    lambda v: v.Check(self._reduce == 'median')),
+            ]),
         ]
         
         self.Bind(wx.EVT_WINDOW_DESTROY, self.OnDestroy)
@@ -456,6 +999,9 @@ class LineProfile(LinePlot):
         
         self._linewidth = 1  # Line width to integrate [pixel].
         self._logicp = True  # Line axis in logical unit.
+        self._interp = 'nearest'  # Interpolation method (cf. sample_line).
+        self._reduce = 'mean'     # Reduction across the line width.
+        self._version = 0  # Counter of the plot data modification.
         
         self.selected.set_linestyle('')
 
@@ -487,8 +1033,8 @@ class LineProfile(LinePlot):
             u = self._frame.unit
             ru = u if p else 1/u
             self.xlim *= ru
-            x = self._plot.get_xdata(orig=0)
-            self._plot.set_xdata(x * ru)
+            x, y = self.plotdata
+            self.set_line_data(self._plot, x * ru, y)
             if self.region is not None:
                 self.region *= ru
             sel = self.selector
@@ -501,16 +1047,26 @@ class LineProfile(LinePlot):
         if self._frame:
             self.linplot(self._frame, fit=0)
 
+    def set_interp(self, method):
+        self._interp = method
+        if self._frame:
+            self.linplot(self._frame, fit=0)
+
+    def set_reduce(self, reduce):
+        self._reduce = reduce
+        if self._frame:
+            self.linplot(self._frame, fit=0)
+
     @property
     def boundary(self):
-        x = self._plot.get_xdata(orig=0)
+        x = self.plotdata[0]
         if x.size:
             return x[[0,-1]]
 
     @property
     def plotdata(self):
-        """Plotted (xdata, ydata) in single plot."""
-        return self._plot.get_data(orig=0)
+        """Plotted (xdata, ydata) in single plot (not decimated)."""
+        return self.get_line_data(self._plot)
 
     def linplot(self, frame, fit=True, force=True):
         if not force:
@@ -526,42 +1082,20 @@ class LineProfile(LinePlot):
             
             xx, yy = sel[:,-2:]  # Get the last 2-selected line.
             nx, ny = frame.xytopixel(xx, yy)  # Converts to pixel [ny,nx]
-            lx = nx[1] - nx[0]
-            ly = ny[1] - ny[0]
-            if lx or ly:
-                L = np.hypot(lx, ly)  # pixel length
-                nv = (-ly/L, lx/L)    # and norm vector to L
-            else:
-                L = 0
-                nv = (0, 0)
             
             ## ピクセル空間：長さ L, サイズ N 分割でラインプロファイルをとる．
-            lw = self._linewidth
-            N = int(L) + 1
-            xs = np.linspace(nx[0], nx[1], N)
-            ys = np.linspace(ny[0], ny[1], N)
-            zs = np.zeros(N)
-            h, w = frame.buffer.shape[:2]
-            for k in np.arange(-(lw-1)/2, (lw+1)/2):
-                x = xs + k * nv[0]
-                y = ys + k * nv[1]
-                mask = (0 <= x) & (x < w) & (0 <= y) & (y < h)
-                if any(mask):
-                    x = x[mask]
-                    y = y[mask]
-                    zi = frame.buffer[y.astype(int), x.astype(int)]  # nearest: 速くてそこそこ正確
-                    # zi = ndimage.map_coordinates(frame.buffer, np.vstack((y, x)))  # spline: 遅いが正確
-                    if zi.dtype in (np.complex64, np.complex128):
-                        zi = np.log(1 + abs(zi))
-                    zs[mask] += zi
-            zs /= lw
+            zs = sample_line(frame.buffer, nx, ny, self._linewidth,
+                             method=self._interp, reduce=self._reduce)
+            N = len(zs)
+            L = np.hypot(nx[1]-nx[0], ny[1]-ny[0])
             
             if self._logicp:  # axis to logical length  # 論理長さ空間を使用する
                 L = np.hypot(xx[1]-xx[0], yy[1]-yy[0])
             
             ls = np.linspace(0, L, N)
-            self._plot.set_data(ls, zs)
+            self.set_line_data(self._plot, ls, zs)
             self._plot.set_visible(1)
+            self._version += 1
             
             if fit and len(ls) > 1:  # drawing area
                 ly = self.ylim
@@ -569,6 +1103,29 @@ class LineProfile(LinePlot):
                 self.ylim = ly[0], max(ly[1], max(zs))
         self.draw()
 
+    def kymograph(self, frame=None, frames=None, **kwargs):
+        """Sample the selected line across the frames.
+        
+        Args:
+            frame: frame of the line selected (default to the current frame)
+            frames: frames to profile (default to all frames of the view)
+            **kwargs: max_workers, callback (cf. `sample_stack`)
+        
+        Returns:
+            kymograph <float64> of shape (len(frames), N), or None if no line.
+        """
+        frame = frame or self._frame
+        if not frame:
+            return None
+        sel = frame.selector
+        if sel.shape[1] < 2:
+            return None
+        if frames is None:
+            frames = frame.parent.get_all_frames()
+        xx, yy = sel[:,-2:]  # Get the last 2-selected line.
+        return sample_stack(frames, xx, yy, self._linewidth,
+                            method=self._interp, reduce=self._reduce, **kwargs)
+
     def writeln(self):
         if not self.modeline.IsShown():
             return
@@ -606,7 +1163,8 @@ class LineProfile(LinePlot):
         """Draw plots and fills (override).
         Call each time the drawing should be updated.
         """
-        x, y = self.plotdata
+        LinePlot.OnDraw(self, evt)
+        x, y = self._plot.get_data(orig=0)  # decimated if long
         if x.size:
             self._fill.set_xy(list(chain([(x[0], 0)], zip(x, y), [(x[-1], 0)])))
         self.writeln()
@@ -705,27 +1263,66 @@ class LineProfile(LinePlot):
     peak_blur_ratio = 0.01
     peak_prominence_ratio = 0.1
 
+    def _peak_params(self, x):
+        ## Blur and prominence of the peaks at the current zoom (internal use only).
+        ux = x[1] - x[0]  # equal spacing length
+        lw = max(1, self.peak_blur_ratio * (self.xbound[1] - self.xbound[0]) / ux)
+        lp = self.peak_prominence_ratio * (self.ybound[1] - self.ybound[0])
+        return lw, lp
+
     def OnMarkPeaks(self, evt):
         """Set markers on peaks."""
         x, y = self.plotdata
         if x.size > 1:
-            # lw = 5
-            ux = x[1] - x[0]  # equal spacing length
-            lw = max(1, self.peak_blur_ratio * (self.xbound[1] - self.xbound[0]) / ux)
-            lp = self.peak_prominence_ratio * (self.ybound[1] - self.ybound[0])
-            # window = np.hanning(lw)
-            # window = signal.windows.gaussian(lw, std=lw/6)
-            # ys = np.convolve(window/window.sum(), y, mode='same')
-            ys = ndimage.gaussian_filter1d(y, sigma=lw/6)
-            
-            maxima, _ = signal.find_peaks(ys, prominence=lp)
-            minima, _ = signal.find_peaks(-ys, prominence=lp)
-            
-            peaks = np.sort(np.append(maxima, minima))
+            lw, lp = self._peak_params(x)
+            peaks = self.peak_finder.find(x, y, sigma=lw/6, prominence=lp,
+                                          key=(id(self), self._version))
             if peaks.size:
-                self.selector = x[peaks], y[peaks]
+                self.selector = peaks['position'], peaks['height']
             self.message(f"Peak detection: blur {lw=:g}, prom {lp=:g}")
 
+    def batch_peaks(self, frame=None, frames=None, sigma=None, prominence=None, **kwargs):
+        """Find the peaks of the selected line across the frames.
+        
+        Args:
+            frame: frame of the line selected (default to the current frame)
+            frames: frames to profile (default to all frames of the view)
+            sigma: blur [sample] (default to that of OnMarkPeaks)
+            prominence: required prominence (default to that of OnMarkPeaks)
+            **kwargs: max_workers, callback (cf. `sample_stack`)
+        
+        Returns:
+            list of (frame, peaks <structured array>), or None if no line.
+            The peaks can be saved in the frame attributes by `PeakFinder.to_attr`.
+        """
+        frame = frame or self._frame
+        if not frame:
+            return None
+        if frames is None:
+            frames = frame.parent.get_all_frames()
+        frames = list(frames)
+        zss = self.kymograph(frame, frames, **kwargs)
+        if zss is None or zss.shape[1] < 2:
+            return None
+        
+        xx, yy = frame.selector[:,-2:]  # Get the last 2-selected line.
+        if self._logicp:
+            L = np.hypot(xx[1]-xx[0], yy[1]-yy[0])
+        else:
+            nx, ny = frame.xytopixel(xx, yy)
+            L = np.hypot(nx[1]-nx[0], ny[1]-ny[0])
+        x = np.linspace(0, L, zss.shape[1])
+        if sigma is None or prominence is None:
+            lw, lp = self._peak_params(x)
+            if sigma is None:
+                sigma = lw/6
+            if prominence is None:
+                prominence = lp
+        line = (*xx, *yy, self._linewidth, self._interp, self._reduce, zss.shape[1])
+        return [(f, self.peak_finder.find(x, zs, sigma, prominence,
+                                          key=(id(f), f.version, f.unit, *f.center, line)))
+                for f, zs in zip(frames, zss)]
+
     def OnMarkSelectionBegin(self, evt):
         org = self.p_event
         xs, ys = self.selector
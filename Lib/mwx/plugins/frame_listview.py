@@ -1,6 +1,7 @@
 #! python3
 """Property list of buffers.
 """
+from math import prod
 from pprint import pformat
 import time
 import wx
@@ -68,6 +69,7 @@ class CheckList(wx.ListCtrl, ListCtrlAutoWidthMixin, CtrlInterface):
             ("shape", 90),
             ("dtype", 60),
             ("Mb",   40),
+            ("resident", 60),
             ("unit", 60),
             ("timestamp", 120),
             ("annotation", 240),
@@ -128,12 +130,14 @@ class CheckList(wx.ListCtrl, ListCtrlAutoWidthMixin, CtrlInterface):
         return wx.ListCtrl.Destroy(self)
 
     def UpdateInfo(self, frame):
+        shape, dtype = frame.buffer_spec  # Don't read evicted buffer.
         info = {
             "id"    : frame.index,
             "name"  : frame.name,
-            "shape" : frame.buffer.shape,
-            "dtype" : frame.buffer.dtype,
-            "Mb"    : "{:.1f}".format(frame.buffer.nbytes / 1e6),
+            "shape" : shape,
+            "dtype" : dtype,
+            "Mb"    : "{:.1f}".format(prod(shape) * dtype.itemsize / 1e6),
+            "resident": frame.residency,
             "unit"  : "{:g}{}".format(frame.unit, '*' if frame.localunit else ''),
             "timestamp": time.strftime("%y/%m/%d %H:%M:%S", time.localtime(frame.timestamp)),
             "annotation": frame.annotation,
@@ -1,7 +1,10 @@
 #! python3
 """Line profile.
 """
-from mwx.graphman import Layer
+import wx
+
+from mwx.framework import ID_
+from mwx.graphman import Layer, Thread
 from mwx.matplot2lg import LineProfile
 
 
@@ -17,6 +20,19 @@ class Plugin(Layer):
         
         self.layout((self.plot,), expand=2, border=0)
         
+        self.thread = Thread(self)
+        
+        self.plot.menu += [
+            (),
+            (ID_(219), "&Kymograph", "Profile the line across all frames to output",
+                lambda v: self.kymograph(),
+                lambda v: v.Enable(not self.thread.active)),
+                
+            (ID_(220), "&Peaks to attributes", "Find peaks across all frames to the attributes",
+                lambda v: self.find_peaks(),
+                lambda v: v.Enable(not self.thread.active)),
+        ]
+        
         @self.handler.bind('page_shown')
         def activate(evt):
             for view in self.parent.graphic_views:
@@ -33,3 +49,37 @@ class Plugin(Layer):
         @self.handler.bind('pane_undocked')
         def _draw():
             self.plot.draw(internal_callback=False)
+
+    def kymograph(self):
+        """Profile the selected line across all frames, and load it to output."""
+        frame = self.parent.selected_view.frame
+        if frame:
+            self.thread.Start(self._kymograph, frame)
+
+    def _kymograph(self, frame):
+        self.message(f"Profiling {len(frame.parent)} frames...")
+        dst = self.plot.kymograph(frame, callback=lambda i, zs: self.thread.check())
+        if dst is None:
+            self.message("\b no line selected.")
+            return
+        wx.CallAfter(self.output.load, dst, f"*kymograph of {frame.name}*",
+                     localunit=frame.unit)
+        self.message("\b done")
+
+    def find_peaks(self):
+        """Find peaks of the selected line across all frames, and save them to
+        the frame attributes `peaks` (exported with the index file).
+        """
+        frame = self.parent.selected_view.frame
+        if frame:
+            self.thread.Start(self._find_peaks, frame)
+
+    def _find_peaks(self, frame):
+        self.message(f"Finding peaks in {len(frame.parent)} frames...")
+        res = self.plot.batch_peaks(frame, callback=lambda i, zs: self.thread.check())
+        if res is None:
+            self.message("\b no line selected.")
+            return
+        for f, peaks in res:
+            wx.CallAfter(f.update_attr, {'peaks': self.plot.peak_finder.to_attr(peaks)})
+        self.message("\b done")
@@ -1,6 +1,9 @@
 #! python3
 """mwxlib core utilities.
 """
+from bisect import bisect
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import contextmanager
 from functools import wraps
 from bdb import BdbQuit
@@ -16,7 +19,9 @@ import tokenize
 import fnmatch
 import pkgutil
 import pydoc
+import asyncio
 import inspect
+import threading
 from inspect import isclass, ismodule, ismethod, isbuiltin, isfunction
 from pprint import pprint
 
@@ -484,11 +489,88 @@ is_url.pattern = r"https?://[^\s<>()\"']+"
 
 class SSM(dict):
     """Single State Machine/Context of FSM.
+    
+    Note:
+        The wildcard keys are compiled into a regex, and the event matching
+        is memoized until the keys of the context change.
     """
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self, *args, **kwargs)
+        self.__invalidate()
+        self.validated = False  # Are the keys ordered by FSM.validate?
+
     def __call__(self, event, *args, **kwargs):
         for act in self[event]:
             act(*args, **kwargs)
 
+    def __invalidate(self):
+        self.__matches = {}     # cache of {event: pattern}
+        self.__patterns = None  # wildcard keys in order
+        self.__regex = None     # compiled regex of the wildcard keys
+
+    def __setitem__(self, key, value):
+        if key not in self:
+            self.__invalidate()
+            self.validated = False
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self.__invalidate()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def pop(self, *args):
+        self.__invalidate()
+        return dict.pop(self, *args)
+
+    def popitem(self):
+        self.__invalidate()
+        return dict.popitem(self)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self.__invalidate()
+            self.validated = False
+        return dict.setdefault(self, key, default)
+
+    def update(self, *args, **kwargs):
+        n = len(self)
+        dict.update(self, *args, **kwargs)
+        if len(self) != n:  # new keys added
+            self.__invalidate()
+            self.validated = False
+
+    def clear(self):
+        self.__invalidate()
+        dict.clear(self)
+
+    def match(self, event):
+        """Find the first wildcard key that matches the event (fnmatch rule).
+        
+        Returns:
+            The matched key or None.
+        """
+        try:
+            return self.__matches[event]
+        except KeyError:
+            pass
+        if self.__patterns is None:
+            self.__patterns = [k for k in self
+                               if isinstance(k, str) and re.search(r"[*?[]", k)]
+            if self.__patterns:
+                self.__regex = re.compile('|'.join(map(fnmatch.translate, self.__patterns)))
+        pat = None
+        if self.__regex and self.__regex.match(event):
+            ## Find which one matches first (only once for each event).
+            pat = next(p for p in self.__patterns if fnmatch.fnmatchcase(event, p))
+        if len(self.__matches) > 1024:
+            self.__matches.clear()
+        self.__matches[event] = pat
+        return pat
+
     def __repr__(self):
         return "<{} object at 0x{:X}>".format(self.__class__.__name__, id(self))
 
@@ -528,6 +610,65 @@ class SSM(dict):
         return False
 
 
+class FSMTracer:
+    """Tracer of FSM actions.
+    
+    Records (timestamp, state, event, action, duration) of each action in the
+    ring buffer, and aggregates the number of calls, total/max durations, and
+    the histogram of durations for each action.
+    
+    To start tracing, set ``FSM.tracer = FSMTracer()`` (or to an FSM instance).
+    To stop tracing, set ``FSM.tracer = None``.
+    """
+    ## Upper edges of the histogram of durations [s].
+    bins = (1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1)
+
+    def __init__(self, maxlen=4096):
+        self.records = deque(maxlen=maxlen)
+        self.stats = {}  # {action: [count, total, max, histogram]}
+
+    def __call__(self, action, state, event, /, *args, **kwargs):
+        t = time.perf_counter()
+        try:
+            return action(*args, **kwargs)
+        finally:
+            dt = time.perf_counter() - t
+            self.records.append((time.time(), state, event, action, dt))
+            self._aggregate(action, dt)
+
+    def _aggregate(self, action, dt):
+        """Add the duration to the stats of the action (internal use only)."""
+        try:
+            st = self.stats[action]
+        except KeyError:
+            st = self.stats[action] = [0, 0, 0, [0] * (len(self.bins) + 1)]
+        except TypeError:
+            return  # unhashable action
+        st[0] += 1
+        st[1] += dt
+        st[2] = max(st[2], dt)
+        st[3][bisect(self.bins, dt)] += 1
+
+    def clear(self):
+        self.records.clear()
+        self.stats.clear()
+
+    def top(self, n=None, key='total'):
+        """List the stats of the hottest actions.
+        
+        Args:
+            n: number of actions to list (default: all).
+            key: sort key: 'count', 'total', 'mean', or 'max'.
+        
+        Returns:
+            list of (action, count, total, mean, max, histogram).
+        """
+        k = ('count', 'total', 'mean', 'max').index(key) + 1
+        items = [(act, c, t, t/c, m, hist) for act, (c, t, m, hist) in self.stats.items()]
+        items.sort(key=lambda v: v[k], reverse=True)
+        return items[:n]
+
+
 class FSM(dict):
     """Finite State Machine.
     
@@ -557,9 +698,39 @@ class FSM(dict):
     
     Note:
         There is no enter/exit event handler.
+    
+    Note:
+        The events posted by ``post`` are coalesced (latest-wins) and handled
+        later by ``flush``, which is called via the ``scheduler``.
+    
+    Note:
+        If ``threadsafe`` is set, the calls from threads other than the owner
+        (which created the FSM) are queued by ``queue`` and handled in order
+        in the owner thread, which requires the ``scheduler``.
+        The queued calls return None instead of the retvals.
+    
+    Note:
+        Async actions (coroutine functions or functions decorated with
+        ``asyncall``) run in the thread pool and return futures as retvals.
+        The exceptions they raise are dumped in the same way as sync actions.
+        They must not touch GUI objects directly (use wx.CallAfter instead).
     """
     debug = 0
 
+    scheduler = None  # Function to schedule a call (e.g. wx.CallAfter).
+
+    ## If True, the calls from other threads are queued and handled in the owner thread.
+    threadsafe = False
+
+    queue_maxlen = 1024  # Max number of the events queued from other threads.
+
+    ## Policy of the queue: 'drop' (default) keeps every event in order, and
+    ## 'merge' merges the same events pending (latest args win).
+    ## In either case, the oldest event is dropped when the queue is full.
+    queue_policy = 'drop'
+
+    tracer = None  # FSMTracer to record the actions (None: no trace).
+
     default_state = None  # Used for define/undefine methods.
 
     current_state = property(lambda self: self.__state)
@@ -591,7 +762,17 @@ class FSM(dict):
                 default = next((k for k in contexts if k is not None), None)
         self.default_state = default
         self.clear(default)  # the first clear creates object localvars
+        self.__batch = 0
+        self.__dirty = set()  # states to be validated at the end of the batch
+        self.__table = None   # FSMTable used when frozen
         self.update(contexts)
+        self.__pending = {}  # {event: (args, kwargs)} to be handled later
+        self.__owner = threading.get_ident()
+        self.__lock = threading.Lock()
+        self.__queue = deque()  # [event, args, kwargs] queued from other threads
+        self.__queued = {}      # {event: item} to merge
+        self.__draining = False
+        self.dropped = 0  # Number of the events dropped from the full queue.
 
     def __missing__(self, key):
         raise Exception("FSM logic-error: undefined state {!r}".format(key))
@@ -615,6 +796,9 @@ class FSM(dict):
             - process the event (no actions) -> []
             - no event:transaction -> None
         """
+        if self.threadsafe and threading.get_ident() != self.__owner:
+            return self.queue(event, *args, **kwargs)
+        
         recept = False  # Is transaction performed?
         retvals = []  # retvals of actions
         self.__event = event
@@ -645,6 +829,72 @@ class FSM(dict):
         if recept:
             return retvals
 
+    def post(self, event, *args, **kwargs):
+        """Handle the event later, coalescing it with the same event pending.
+        
+        The pending event is handled only once with the latest args when
+        ``flush`` is called. If no scheduler, it is handled immediately.
+        """
+        if not self.scheduler:
+            return self(event, *args, **kwargs)
+        if not self.__pending:
+            self.scheduler(self.flush)
+        self.__pending.pop(event, None)  # move to the end
+        self.__pending[event] = (args, kwargs)
+
+    def flush(self):
+        """Handle the pending events in the order posted."""
+        while self.__pending:
+            event = next(iter(self.__pending))
+            args, kwargs = self.__pending.pop(event)
+            self(event, *args, **kwargs)
+
+    def queue(self, event, *args, **kwargs):
+        """Queue the event from any thread to be handled in the owner thread.
+        
+        The queue is drained in order via the ``scheduler``, which is called
+        only once until the queue gets empty. If no scheduler, the event is
+        handled immediately (in the caller thread).
+        """
+        if not self.scheduler:
+            return self(event, *args, **kwargs)
+        with self.__lock:
+            q = self.__queue
+            item = self.__queued.get(event)
+            if item is not None and self.queue_policy == 'merge':
+                item[1:] = args, kwargs
+                return
+            if len(q) >= self.queue_maxlen:
+                old = q.popleft()
+                if self.__queued.get(old[0]) is old:
+                    del self.__queued[old[0]]
+                self.dropped += 1
+            item = [event, args, kwargs]
+            q.append(item)
+            self.__queued[event] = item
+            if self.__draining:
+                return
+            self.__draining = True
+        self.scheduler(self.drain)
+
+    def drain(self):
+        """Handle the queued events in the owner thread (internal use only)."""
+        while 1:
+            with self.__lock:
+                if not self.__queue:
+                    self.__draining = False
+                    return
+                item = self.__queue.popleft()
+                event, args, kwargs = item
+                if self.__queued.get(event) is item:
+                    del self.__queued[event]
+            try:
+                self(event, *args, **kwargs)
+            except Exception:
+                with self.__lock:
+                    self.__draining = False  # the next queue will reschedule
+                raise
+
     def call(self, event, *args, **kwargs):
         """Invoke the event handlers (internal use only).
         
@@ -658,37 +908,78 @@ class FSM(dict):
             - process the event (no actions) -> []
             - no event:transaction -> None
         """
-        context = self[self.__state]
-        if event in context:
+        if self.__table is not None:
+            hit = self.__table.lookup(self.__state, event)
+            if hit is None:
+                self.__debug_call__(event, *args, **kwargs)  # check when no transition
+                return None  # no event, no action
+            event, transaction = hit
+        else:
+            context = self[self.__state]
+            if event not in context:
+                if isinstance(event, str):  # matching test using fnmatch
+                    pat = context.match(event)
+                    if pat is not None:
+                        return self.call(pat, *args, **kwargs)  # recursive call
+                self.__debug_call__(event, *args, **kwargs)  # check when no transition
+                return None  # no event, no action
             transaction = context[event]
-            self.__prev_state = self.__state  # save previous state
-            self.__state = transaction[0]     # the state transits here
-            self.__debug_call__(event, *args, **kwargs)  # check after transition
-            retvals = []
-            for act in transaction[1:]:
-                try:
-                    ret = act(*args, **kwargs)  # call actions after transition
-                    retvals.append(ret)
-                except BdbQuit:
-                    pass
-                except Exception as e:
-                    self.dump("- FSM exception: {!r}".format(e),
-                              "  event  : {}".format(event),
-                              "  from   : {}".format(self.__prev_state),
-                              "  to     : {}".format(self.__state),
-                              "  action : {}".format(typename(act)),
-                              "  args   : {}".format(args),
-                              "  kwargs : {}".format(kwargs),
-                              "")
-            return retvals
         
-        if isinstance(event, str):  # matching test using fnmatch
-            for pat in context:
-                if fnmatch.fnmatchcase(event, pat):
-                    return self.call(pat, *args, **kwargs)  # recursive call
+        self.__prev_state = self.__state  # save previous state
+        self.__state = transaction[0]     # the state transits here
+        self.__debug_call__(event, *args, **kwargs)  # check after transition
+        retvals = []
+        for act in transaction[1:]:
+            try:
+                if self.tracer is None:
+                    ret = act(*args, **kwargs)  # call actions after transition
+                else:
+                    ret = self.tracer(act, self.__prev_state, event, *args, **kwargs)
+                if inspect.iscoroutine(ret):
+                    ret = self.get_executor().submit(asyncio.run, ret)
+                if isinstance(ret, Future):
+                    ret.add_done_callback(self.__watch(act, event, args, kwargs))
+                retvals.append(ret)
+            except BdbQuit:
+                pass
+            except Exception as e:
+                self.__dump(e, act, event, args, kwargs,
+                            self.__prev_state, self.__state)
+        return retvals
+
+    def __dump(self, e, act, event, args, kwargs, src, dst):
+        self.dump("- FSM exception: {!r}".format(e),
+                  "  event  : {}".format(event),
+                  "  from   : {}".format(src),
+                  "  to     : {}".format(dst),
+                  "  action : {}".format(typename(act)),
+                  "  args   : {}".format(args),
+                  "  kwargs : {}".format(kwargs),
+                  "")
+
+    def __watch(self, act, event, args, kwargs):
+        """Make a done-callback of the future to dump the exception."""
+        src, dst = self.__prev_state, self.__state
         
-        self.__debug_call__(event, *args, **kwargs)  # check when no transition
-        return None  # no event, no action
+        def _done(future):
+            if future.cancelled():
+                return
+            try:
+                future.result()
+            except BdbQuit:
+                pass
+            except Exception as e:
+                self.__dump(e, act, event, args, kwargs, src, dst)
+        return _done
+
+    executor = None  # ThreadPoolExecutor shared by async actions.
+
+    @staticmethod
+    def get_executor():
+        """Get the thread pool to run async actions (internal use only)."""
+        if FSM.executor is None:
+            FSM.executor = ThreadPoolExecutor(thread_name_prefix="FSM")
+        return FSM.executor
 
     def __debug_call__(self, event, *args, **kwargs):
         v = self.debug
@@ -754,18 +1045,70 @@ class FSM(dict):
         context.update(temp)
         context.update(sorted(bra, reverse=1))
         context.update(sorted(ast, reverse=1, key=lambda v: len(v[0])))
+        context.validated = True
+
+    frozen = property(lambda self: self.__table is not None)
+
+    def compile(self):
+        """Compile the contexts into a transition table.
+        
+        Returns:
+            FSMTable object (snapshot of the current contexts)
+        """
+        return FSMTable(self)
+
+    def freeze(self):
+        """Freeze the contexts and dispatch the events using the compiled table.
+        
+        The table is discarded when the contexts are changed by the methods of
+        FSM (update, append, remove, define, undefine, bind, and unbind).
+        If a context is changed directly, call ``freeze`` again.
+        """
+        self.__table = self.compile()
+        return self.__table
+
+    def unfreeze(self):
+        """Discard the compiled table."""
+        self.__table = None
+
+    @contextmanager
+    def batch(self):
+        """Context manager to update the contexts in bulk.
+        
+        The contexts changed in the batch are validated only once at the end.
+        """
+        self.__batch += 1
+        try:
+            yield self
+        finally:
+            self.__batch -= 1
+            if not self.__batch:
+                dirty, self.__dirty = self.__dirty, set()
+                for k in dirty:
+                    if k in self:
+                        self.validate(k)
+
+    def __validate(self, state):
+        if self.__batch:
+            self.__dirty.add(state)
+        else:
+            self.validate(state)
 
     def update(self, contexts):
         """Update each context or Add new contexts."""
+        self.__table = None
         for k, v in contexts.items():
             if k in self:
                 self[k].update(self.duplicate(v))
+                if self[k].validated:
+                    continue  # no new event, no need to validate
             else:
                 self[k] = SSM(self.duplicate(v))  # new context
-            self.validate(k)
+            self.__validate(k)
 
     def append(self, contexts):
         """Append new contexts."""
+        self.__table = None
         for k, v in contexts.items():
             if k in self:
                 for event, transaction in v.items():
@@ -774,12 +1117,15 @@ class FSM(dict):
                         continue
                     for act in transaction[1:]:
                         self.bind(event, act, k, transaction[0])
+                if self[k].validated:
+                    continue  # no new event, no need to validate
             else:
                 self[k] = SSM(self.duplicate(v))  # new context
-            self.validate(k)
+            self.__validate(k)
 
     def remove(self, contexts):
         """Remove old contexts."""
+        self.__table = None
         for k, v in contexts.items():
             if k in self:
                 for event, transaction in v.items():
@@ -804,6 +1150,7 @@ class FSM(dict):
         assert isinstance(event, str)
         assert callable(action) or action is None
         
+        self.__table = None
         if state not in self:
             warn(f"- FSM [{state!r}] context newly created.")
             self[state] = SSM()  # new context
@@ -849,6 +1196,7 @@ class FSM(dict):
         """
         assert callable(action) or action is None
         
+        self.__table = None
         if state not in self:
             warn(f"- FSM [{state!r}] context does not exist.")
             return
@@ -882,6 +1230,7 @@ class FSM(dict):
         # state = self.default_state
         if action is None:
             self[state].pop(event, None)  # cf. undefine
+            self.__table = None
             return lambda f: self.define(event, f, state, *args, **kwargs)
         
         f = funcall(action, *args, **kwargs)
@@ -894,6 +1243,170 @@ class FSM(dict):
         self.define(event, None, state)
 
 
+class FSMTable:
+    """Transition table compiled from the contexts of FSM.
+    
+    The states and events are numbered in order, and the table is a flat,
+    immutable tuple indexed by ``sid * len(events) + eid``. Each item is
+    ``(next_sid, actions)`` or None if no transaction.
+    
+    Attributes:
+        states: tuple of states (sid -> state)
+        events: tuple of events (eid -> event)
+        table: tuple of transitions
+        undefined: next states not found in the contexts {(sid, eid): state}
+    
+    Note:
+        The next_sid is -1 if the next state is not found in the contexts.
+    """
+    def __init__(self, fsm):
+        self.default_state = fsm.default_state
+        self.states = tuple(fsm)
+        self.events = tuple({e: 0 for context in fsm.values() for e in context})
+        self.sid = {k: i for i, k in enumerate(self.states)}
+        self.eid = {e: j for j, e in enumerate(self.events)}
+        self.patterns = {}  # wildcard events of each state in order {sid: (eid, ...)}
+        
+        self.undefined = {}  # next states not found in the contexts {(sid, eid): state}
+        
+        m = len(self.events)
+        table = [None] * (len(self.states) * m)
+        for i, k in enumerate(self.states):
+            for e, transaction in fsm[k].items():
+                j = self.eid[e]
+                n = self.sid.get(transaction[0], -1)
+                if n < 0:
+                    self.undefined[i, j] = transaction[0]
+                table[i * m + j] = (n, tuple(transaction[1:]))
+            self.patterns[i] = tuple(self.eid[e] for e in fsm[k]
+                                     if isinstance(e, str) and re.search(r"[*?[]", e))
+        self.table = tuple(table)
+        self.__transactions = {}  # cache of {(state, event): (event, transaction)}
+
+    def __repr__(self):
+        return "<{} object at 0x{:X}>".format(self.__class__.__name__, id(self))
+
+    def __getitem__(self, v):
+        """Get the item of the table by (sid, eid)."""
+        i, j = v
+        return self.table[i * len(self.events) + j]
+
+    def resolve(self, sid, event):
+        """Find the eid of the event in the state sid (fnmatch rule).
+        
+        Returns:
+            eid or -1 if not found.
+        """
+        j = self.eid.get(event, -1)
+        if j >= 0 and self[sid, j] is not None:
+            return j
+        if isinstance(event, str):
+            for j in self.patterns[sid]:
+                if fnmatch.fnmatchcase(event, self.events[j]):
+                    return j
+        return -1
+
+    def lookup(self, state, event):
+        """Find the transaction of the event in the state.
+        
+        Returns:
+            (matched event, (next_state, *actions)) or None.
+        """
+        try:
+            return self.__transactions[state, event]
+        except KeyError:
+            pass
+        try:
+            i = self.sid[state]
+        except KeyError:
+            raise Exception("FSM logic-error: undefined state {!r}".format(state))
+        hit = None
+        j = self.resolve(i, event)
+        if j >= 0:
+            n, actions = self[i, j]
+            k = self.states[n] if n >= 0 else self.undefined[i, j]
+            hit = (self.events[j], (k, *actions))
+        if len(self.__transactions) > 4096:
+            self.__transactions.clear()
+        self.__transactions[state, event] = hit
+        return hit
+
+    def verify(self):
+        """Verify the table.
+        
+        Returns:
+            list of the problems found:
+            
+            - transitions to undefined states
+            - states unreachable from the default state
+            - wildcard events shadowed by the preceding ones
+        """
+        m = len(self.events)
+        problems = []
+        reachable = {self.sid.get(self.default_state)}
+        edges = {}
+        for (i, j), n in self.undefined.items():
+            if n is None:
+                continue  # no transition (in the state None)
+            problems.append("undefined state: {!r} --[{}]--> {!r}".format(
+                            self.states[i], self.events[j], n))
+        for i, k in enumerate(self.states):
+            for j in range(m):
+                item = self.table[i * m + j]
+                if item and item[0] >= 0:
+                    edges.setdefault(i, set()).add(item[0])
+        ## The transitions from the state None can occur in any state.
+        any_ = edges.get(self.sid.get(None), set())
+        stack = list(reachable | any_)
+        reachable |= any_
+        while stack:
+            i = stack.pop()
+            for n in edges.get(i, ()):
+                if n not in reachable:
+                    reachable.add(n)
+                    stack.append(n)
+        for i, k in enumerate(self.states):
+            if k is not None and i not in reachable:
+                problems.append("unreachable state: {!r}".format(k))
+        
+        for i, k in enumerate(self.states):
+            pats = [self.events[j] for j in self.patterns[i]]
+            for p, q in ((p, q) for x, q in enumerate(pats) for p in pats[:x]):
+                if fnmatch.fnmatchcase(q, p):
+                    problems.append("shadowed pattern: [{!r}] {!r} by {!r}".format(k, q, p))
+        return problems
+
+    def to_dot(self, loops=False):
+        """Dump the table as a Graphviz diagram (dot language).
+        
+        Args:
+            loops: If True, the events which do not change the state are included.
+        """
+        m = len(self.events)
+        labels = {}
+        for i, k in enumerate(self.states):
+            for j in range(m):
+                item = self.table[i * m + j]
+                if not item:
+                    continue
+                n = item[0]
+                dst = self.states[n] if n >= 0 else self.undefined[i, j]
+                if dst is None or (not loops and dst == k):
+                    continue
+                labels.setdefault((k, dst), []).append(self.events[j])
+        
+        def _q(v):
+            return '"{}"'.format(str(v).replace('"', r'\"'))
+        
+        lines = ["digraph FSM {"]
+        lines.append("    {} [shape=doublecircle];".format(_q(self.default_state)))
+        for (src, dst), events in labels.items():
+            lines.append("    {} -> {} [label={}];".format(
+                         _q(src), _q(dst), _q(r'\n'.join(map(str, events)))))
+        lines.append("}")
+        return '\n'.join(lines)
+
+
 class TreeList:
     """Interface class for tree list control.
     
@@ -1061,6 +1574,22 @@ def get_fullargspec(f):
             defaults, kwonlyargs, kwonlydefaults)
 
 
+def asyncall(f):
+    """Decorator of FSM action to run in the thread pool.
+    
+    The decorated function returns a future instead of the result.
+    Coroutine functions are also accepted and run in a new event loop.
+    """
+    assert callable(f)
+    
+    @wraps(f)
+    def _Act(*v, **kw):
+        if inspect.iscoroutinefunction(f):
+            return FSM.get_executor().submit(asyncio.run, f(*v, **kw))
+        return FSM.get_executor().submit(f, *v, **kw)
+    return _Act
+
+
 def funcall(f, *args, doc=None, alias=None, **kwargs):
     """Decorator of event handler.
     
@@ -0,0 +1,129 @@
+#! python3
+"""Profiler of FSM actions.
+"""
+import wx
+from wx.lib.mixins.listctrl import ListCtrlAutoWidthMixin
+
+from .utilus import FSM, FSMTracer, typename
+from .controls import Icon, Clipboard
+from .framework import CtrlInterface, Menu
+
+
+class ActionProfiler(wx.ListCtrl, ListCtrlAutoWidthMixin, CtrlInterface):
+    """Profiler of FSM actions.
+    
+    Lists the hottest actions of all FSM handlers while tracing.
+    The histogram column counts the calls taking <10us, <100us, ..., <1s, >=1s.
+    
+    Attributes:
+        parent: shellframe
+        tracer: FSMTracer object
+    """
+    def __init__(self, parent, **kwargs):
+        wx.ListCtrl.__init__(self, parent,
+                             style=wx.LC_REPORT|wx.LC_HRULES, **kwargs)
+        ListCtrlAutoWidthMixin.__init__(self)
+        CtrlInterface.__init__(self)
+        
+        self.Font = wx.Font(9, wx.DEFAULT, wx.NORMAL, wx.NORMAL)
+        
+        self.parent = parent
+        self.tracer = FSMTracer()
+        self._key = 'total'  # sort key
+        self._items = []
+        
+        _alist = (
+            ("action",   200),
+            ("count",     60),
+            ("total[ms]", 70),
+            ("mean[ms]",  70),
+            ("max[ms]",   70),
+            ("histogram",  0),
+        )
+        for k, (header, w) in enumerate(_alist):
+            self.InsertColumn(k, header, width=w)
+        
+        self.Bind(wx.EVT_LIST_COL_CLICK, self.OnSortItems)
+        self.Bind(wx.EVT_CONTEXT_MENU, self.OnContextMenu)
+        
+        self.timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, lambda v: self.update())
+        self.Bind(wx.EVT_WINDOW_DESTROY, self.OnDestroy)
+        
+        @self.handler.bind('C-c pressed')
+        def copy(evt):
+            self.copy()
+
+    def OnDestroy(self, evt):
+        if evt.EventObject is self:
+            if self.tracing:
+                FSM.tracer = None
+            self.timer.Stop()
+        evt.Skip()
+
+    @property
+    def tracing(self):
+        return FSM.tracer is self.tracer
+
+    def start(self):
+        """Start tracing all FSM actions."""
+        FSM.tracer = self.tracer
+        self.timer.Start(1000)
+
+    def stop(self):
+        """Stop tracing."""
+        if self.tracing:
+            FSM.tracer = None
+        self.timer.Stop()
+        self.update()
+
+    def clear(self):
+        self.tracer.clear()
+        self.update()
+
+    def update(self):
+        if not self.IsShownOnScreen() and self.tracing:
+            return
+        self._items = []
+        for act, c, t, m, mx, hist in self.tracer.top(key=self._key):
+            self._items.append([typename(act, qualp=0), str(c),
+                                f"{t*1e3:.1f}", f"{m*1e3:.3f}", f"{mx*1e3:.3f}",
+                                ' '.join(map(str, hist))])
+        try:
+            self.Freeze()
+            self.DeleteAllItems()
+            for i, item in enumerate(self._items):
+                self.InsertItem(i, item[0])
+                for j, v in enumerate(item[1:], 1):
+                    self.SetItem(i, j, v)
+        finally:
+            self.Thaw()
+
+    def copy(self):
+        if not self.SelectedItemCount:
+            return
+        text = ''
+        for i in range(self.ItemCount):
+            if self.IsSelected(i):
+                text += '\t'.join(self._items[i]) + '\n'
+        Clipboard.write(text)
+
+    def OnSortItems(self, evt):  # <wx._core.ListEvent>
+        keys = (None, 'count', 'total', 'mean', 'max', None)
+        if keys[evt.Column]:
+            self._key = keys[evt.Column]
+            self.update()
+
+    def OnContextMenu(self, evt):
+        Menu.Popup(self, [
+            (1, "Copy data", Icon('copy'),
+                lambda v: self.copy(),
+                lambda v: v.Enable(self.SelectedItemCount)),
+            (),
+            (11, "Start tracing", "Start tracing FSM actions", wx.ITEM_CHECK,
+                lambda v: self.stop() if self.tracing else self.start(),
+                lambda v: v.Check(self.tracing)),
+            
+            (12, "Clear", Icon('delete'),
+                lambda v: self.clear()),
+        ])
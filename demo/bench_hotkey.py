@@ -0,0 +1,67 @@
+#! python3
+"""Benchmark of the hotkey dispatch in Nautilus.
+
+Usage: python bench_hotkey.py [repeat]
+    Synthesizes auto-repeated key events and measures the time per keystroke
+    spent in `hotkey` and the FSM dispatch (`on_hotkey_press` and `on_hotkey_up`)
+    of the root shell. Exits with status 1 if the budget is exceeded.
+"""
+import sys
+import time
+import wx
+
+sys.path.append("../Lib")
+from mwx.framework import ShellFrame
+
+## Dispatch budget per keystroke [us].
+## Auto-repeat comes every 30-50 ms, and the rest must be left for the editor.
+BUDGET = 100
+
+## Keystrokes of typing: letters, shifted letters, and caret moves.
+KEYS = [(ord(c), False) for c in "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 "]\
+     + [(ord(c), True) for c in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"]\
+     + [(wx.WXK_LEFT, False), (wx.WXK_RIGHT, False)]
+
+
+def _key_events(shell):
+    for code, shift in KEYS:
+        down = wx.KeyEvent(wx.wxEVT_CHAR_HOOK)
+        up = wx.KeyEvent(wx.wxEVT_KEY_UP)
+        for evt in (down, up):
+            evt.SetKeyCode(code)
+            evt.SetShiftDown(shift)
+            evt.SetEventObject(shell)
+        yield down, up
+
+
+def bench(shell, repeat=200):
+    """Return the times per keystroke [us] (one sample per key)."""
+    events = list(_key_events(shell))
+    for down, up in events:  # Warm up the caches.
+        shell.on_hotkey_press(down)
+        shell.on_hotkey_up(up)
+    samples = []
+    for down, up in events:
+        t = time.perf_counter()
+        for _ in range(repeat):  # auto-repeat
+            shell.on_hotkey_press(down)
+        shell.on_hotkey_up(up)
+        samples.append((time.perf_counter() - t) / repeat * 1e6)
+    return samples
+
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    app = wx.App()
+    frm = ShellFrame(None)
+    try:
+        samples = sorted(bench(frm.rootshell, repeat))
+        mean = sum(samples) / len(samples)
+        worst = samples[-1]
+        print("keys = {}, repeat = {}".format(len(samples), repeat))
+        print("mean = {:.1f} us, median = {:.1f} us, max = {:.1f} us (budget {} us)"
+              .format(mean, samples[len(samples)//2], worst, BUDGET))
+        print("ok" if worst < BUDGET else "over budget")
+    finally:
+        frm.Destroy()
+    sys.exit(worst >= BUDGET)